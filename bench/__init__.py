@@ -0,0 +1 @@
+"""Бенчмарки вычислений дашборда без Streamlit."""
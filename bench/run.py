@@ -0,0 +1,192 @@
+"""Замеры подготовки данных и рендера графиков по страницам на синтетических данных.
+
+    python -m bench.run --sizes 10K 1M
+    python -m bench.run --sizes 10M --no-memory
+
+Для каждого размера генерируется набор (superstore.synth), затем по шагам
+замеряются время и пик выделенной памяти (tracemalloc). Результаты пишутся
+в bench/results/<время>.json, чтобы сравнивать прогоны между коммитами.
+"""
+import argparse
+import gc
+import json
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from superstore import plots, synth
+from superstore.aggregates import Aggregates
+from superstore.breakeven import LEVELS as BREAKEVEN_LEVELS, BreakEven
+from superstore.ingest import clean
+from superstore.losses import LossReport
+from superstore.parallel import aggregate_frame
+from superstore.ranking import ExactRanking, StreamingRanking
+from superstore.render import render_png
+from superstore.schema import bytes_per_row
+from superstore.store import SqlStore, write_store
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+class Recorder:
+    def __init__(self, size, rows, memory=True):
+        self.size = size
+        self.rows = rows
+        self.memory = memory
+        self.records = []
+
+    def measure(self, page, step, fn):
+        """Время выполнения fn и, если включено, пик памяти при повторном прогоне."""
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+
+        peak = None
+        if self.memory:
+            gc.collect()
+            tracemalloc.start()
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        self.records.append({
+            'size': self.size,
+            'rows': self.rows,
+            'page': page,
+            'step': step,
+            'seconds': round(seconds, 6),
+            'peak_bytes': peak,
+        })
+        print(f"{self.size:>6} {page:<12} {step:<28} {seconds:9.3f}s"
+              + (f" {peak / 1e6:9.1f} MB" if peak is not None else ""))
+        return result
+
+    def value(self, page, step, value):
+        """Величина без замера времени, например байт на строку."""
+        self.records.append({'size': self.size, 'rows': self.rows, 'page': page, 'step': step, 'value': value})
+        print(f"{self.size:>6} {page:<12} {step:<28} {value:12.1f}")
+
+
+def bench_size(size, seed, memory, workers):
+    n_rows = synth.parse_size(size)
+    raw = synth.generate(n_rows, seed)
+    rec = Recorder(size, n_rows, memory)
+
+    df = rec.measure('ingest', 'clean', lambda: clean(raw.copy()))
+    # Память строки до и после приведения к схеме
+    rec.value('ingest', 'bytes_per_row.raw', bytes_per_row(raw))
+    rec.value('ingest', 'bytes_per_row.clean', bytes_per_row(df))
+    del raw
+    aggregates = rec.measure('ingest', 'aggregates', lambda: Aggregates.from_frame(df))
+    for n in workers:
+        rec.measure('ingest', f'aggregates.parallel.{n}', lambda: aggregate_frame(df, 'Month', n))
+    cube = aggregates.cube
+
+    # «Графики»: срез куба по одному фильтру и пять графиков
+    region, year = cube.regions[0], cube.years[1]
+    totals = rec.measure('charts', 'prep.category_totals', lambda: cube.category_totals(region, year))
+    monthly = rec.measure('charts', 'prep.monthly_sales', lambda: cube.monthly_sales(region, year))
+    customers = rec.measure('charts', 'prep.top_customers', lambda: cube.top_customers(region, year, n=10))
+    first, last = aggregates.rollups.bounds
+    rec.measure('charts', 'prep.rollups.week', lambda: aggregates.rollups.series(first, first + pd.Timedelta(days=6), region))
+    rec.measure('charts', 'prep.rollups.full', lambda: aggregates.rollups.series(first, last, region))
+    rows = rec.measure('charts', 'prep.scatter_rows', lambda: df[(df['Region'] == region) & (df['Year'] == year)])
+
+    # Те же срезы SQL-запросами к SQLite-базе
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqlStore(rec.measure('charts', 'sqlite.build', lambda: write_store([df], Path(tmp) / 'bench.sqlite')))
+        rec.measure('charts', 'sqlite.category_totals', lambda: store.category_totals(region, year))
+        rec.measure('charts', 'sqlite.monthly_sales', lambda: store.monthly_sales(region, year))
+        rec.measure('charts', 'sqlite.top_customers', lambda: store.top_customers(region, year, n=10))
+        rec.measure('charts', 'sqlite.scatter_rows', lambda: store.scatter_rows(region, year))
+
+    rec.measure('charts', 'render.category_sales', lambda: render_png(
+        lambda ax: plots.category_bars(ax, totals[['Category', 'Sales']], 'Sales', "viridis", "Продажи"), (8, 5)))
+    rec.measure('charts', 'render.monthly_sales', lambda: render_png(
+        lambda ax: plots.monthly_line(ax, monthly), (10, 6)))
+    rec.measure('charts', 'render.discount_profit', lambda: render_png(
+        lambda ax: plots.discount_profit_scatter(ax, rows, alpha=0.7), (10, 6)))
+    rec.measure('charts', 'render.top_customers', lambda: render_png(
+        lambda ax: plots.customers_barh(ax, customers, "Количество заказов"), (8, 6)))
+
+    # «Убытки»
+    report = rec.measure('losses', 'prep.loss_report', lambda: LossReport.from_frame(df))
+    by_sub = rec.measure('losses', 'prep.rollups', lambda: [report.by(key, 10) for key in ('Category', 'Sub-Category', 'Customer Name', 'Region')])[1]
+    frequencies = aggregates.discount_frequencies()
+    breakeven = rec.measure('losses', 'prep.breakeven.build', lambda: BreakEven.from_frame(df))
+    rec.measure('losses', 'prep.breakeven.curves', lambda: [breakeven.break_even(level) for level in BREAKEVEN_LEVELS])
+    rec.measure('losses', 'render.loss_by_subcategory', lambda: render_png(
+        lambda ax: plots.loss_bars(ax, by_sub, "OrRd", "Подкатегория"), (10, 6)))
+    rec.measure('losses', 'render.discount_histogram', lambda: render_png(
+        lambda ax: plots.discount_histogram(ax, frequencies, report.avg_discount, weights='rows'), (10, 6)))
+    rec.measure('losses', 'render.profit_ratio', lambda: render_png(
+        lambda ax: plots.profit_ratio_scatter(ax, df[df['is_loss']]), (10, 6)))
+
+    # «Выводы»
+    category_sales = rec.measure('conclusions', 'prep.category_totals', lambda: cube.category_totals())
+    rec.measure('conclusions', 'prep.region_totals', lambda: cube.region_totals())
+    rec.measure('conclusions', 'prep.monthly_sales', lambda: cube.monthly_sales())
+    top = rec.measure('conclusions', 'prep.top_customers_by_orders', lambda: aggregates.top_customers_by_orders(10))
+    rec.measure('conclusions', 'prep.ranking.exact', lambda: ExactRanking.from_frame(df).top(10))
+    rec.measure('conclusions', 'prep.ranking.streaming', lambda: StreamingRanking.from_frame(df).top(10))
+    rec.measure('conclusions', 'render.sales_and_profit', lambda: render_png(
+        lambda ax: plots.sales_and_profit_bars(ax, category_sales)))
+    rec.measure('conclusions', 'render.discount_profit', lambda: render_png(
+        lambda ax: plots.discount_profit_scatter(ax, df, alpha=0.6)))
+    rec.measure('conclusions', 'render.top_customers', lambda: render_png(
+        lambda ax: plots.customers_barh(ax, top, "Количество уникальных заказов")))
+    return rec.records
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки вычислений дашборда")
+    parser.add_argument('--sizes', nargs='+', default=['10K'], help="10K, 1M, 10M или число строк")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="не замерять память (вдвое быстрее)")
+    parser.add_argument('--workers', nargs='*', type=int, default=[], help="числа процессов для параллельной агрегации")
+    parser.add_argument('--output', type=Path, default=None, help="путь к JSON с результатами")
+    args = parser.parse_args(argv)
+
+    started = datetime.now(timezone.utc)
+    records = []
+    for size in args.sizes:
+        records.extend(bench_size(size, args.seed, memory=not args.no_memory, workers=args.workers))
+
+    output = args.output or RESULTS_DIR / f"{started:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    result = {
+        'started': started.isoformat(),
+        'seed': args.seed,
+        'environment': environment(),
+        'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'records': records,
+    }
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False))
+    print(f"Результаты: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Замер памяти на одну сессию дашборда при одновременных пользователях.
+
+    python -m bench.sessions --sessions 20
+
+В одном процессе открывается N headless-сессий (streamlit AppTest), каждая
+проходит по всем страницам и выбирает свой регион и год на «Графиках».
+После каждой сессии снимается приватная память процесса (без разделяемых
+страниц отображённого снимка). Прирост на сессию — то, что нужно умножать
+на число аналитиков при выборе хоста.
+"""
+import argparse
+import ctypes
+import gc
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from superstore.instrument import private_bytes, rss_bytes
+
+from .run import RESULTS_DIR, environment
+
+APP = Path(__file__).resolve().parent.parent / 'app.py'
+PAGES = ["Главная", "Графики", "Убытки", "Выводы"]
+
+
+def open_session(number):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APP), default_timeout=600)
+    at.run()
+    for page in PAGES:
+        at.sidebar.radio[0].set_value(page).run()
+        if page == "Графики":
+            regions = at.selectbox[0].options
+            at.selectbox[0].set_value(regions[number % len(regions)]).run()
+            low, high = at.slider[0].min, at.slider[0].max
+            at.slider[0].set_value(low + number % (high - low + 1)).run()
+    if at.exception:
+        raise RuntimeError(f"Сессия {number}: {at.exception[0].value}")
+    return at
+
+
+def snapshot():
+    gc.collect()
+    _malloc_trim()
+    return {'rss_bytes': rss_bytes(), 'private_bytes': private_bytes()}
+
+
+def _malloc_trim():
+    """Возвращает системе освобождённую кучу glibc, чтобы RSS показывал удерживаемую память."""
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Память на сессию дашборда")
+    parser.add_argument('--sessions', type=int, default=10)
+    parser.add_argument('--output', type=Path, default=None, help="путь к JSON с результатами")
+    args = parser.parse_args(argv)
+
+    started = datetime.now(timezone.utc)
+    baseline = snapshot()
+    # Первая сессия загружает общие для процесса данные, её считаем отдельно
+    sessions = [open_session(0)]
+    warm = snapshot()
+    points = [dict(sessions=1, **warm)]
+    print(f"Общие данные процесса: {(warm['private_bytes'] - baseline['private_bytes']) / 1e6:.1f} МБ приватной памяти")
+
+    for number in range(1, args.sessions):
+        sessions.append(open_session(number))
+        point = dict(sessions=number + 1, **snapshot())
+        points.append(point)
+        print(f"{point['sessions']:>4} сессий: RSS {point['rss_bytes'] / 1e6:8.1f} МБ,"
+              f" приватная {point['private_bytes'] / 1e6:8.1f} МБ")
+
+    # Наклон прямой по всем точкам устойчивее разности крайних: куча то растёт, то сжимается
+    per_session = None
+    if len(points) > 2:
+        x = [point['sessions'] for point in points]
+        y = [point['private_bytes'] for point in points]
+        per_session = float(np.polyfit(x, y, 1)[0])
+    if per_session is not None:
+        print(f"Прирост приватной памяти на сессию: {per_session / 1e6:.2f} МБ")
+
+    output = args.output or RESULTS_DIR / f"sessions-{started:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'started': started.isoformat(),
+        'environment': environment(),
+        'baseline': baseline,
+        'points': points,
+        'per_session_private_bytes': per_session,
+    }, indent=2, ensure_ascii=False))
+    print(f"Результаты: {output}")
+
+
+if __name__ == '__main__':
+    main()
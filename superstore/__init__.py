@@ -0,0 +1 @@
+"""Слой данных и вычислений для дашборда Tableau Superstore."""
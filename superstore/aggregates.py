@@ -0,0 +1,241 @@
+"""Объединяемые агрегаты, из которых строятся все графики дашборда.
+
+Агрегаты можно посчитать по всей таблице сразу или по частям и сложить через
+merge_all — результат один и тот же. На этом держится потоковая загрузка.
+
+Заказ учитывается по своей первой строке (признак first). В таблице целиком
+это первое вхождение Order ID; если заказ может прийти в нескольких частях,
+признак для каждой части выдаёт общий SeenOrders.
+"""
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+from .breakeven import LEVELS as BREAKEVEN_LEVELS, BreakEven
+from .cube import DIMENSIONS, Cube
+from .losses import LOSS_KEYS, LossReport
+from .ranking import CAPACITY, load_ranking, ranking_from_frame
+from .rollups import Rollups
+from .scatter import MAX_POINTS
+from .schema import first_lines
+
+# Колонки строк, которые сохраняются в выборке для диаграмм рассеяния
+SAMPLE_COLUMNS = ['Region', 'Year', 'Category', 'Discount', 'Profit', 'Profit Ratio', 'is_loss']
+# По этим колонкам считается хэш строки, задающий детерминированную выборку
+SAMPLE_HASH_COLUMNS = ['Order ID', 'Product Name', 'Sales', 'Profit', 'Discount']
+# Сколько частичных агрегатов копится перед одним общим слиянием
+MERGE_BATCH = 16
+
+
+class Aggregates:
+    """Куб, дневные ряды, рейтинг клиентов, сводка убытков, частоты скидок,
+    ячейки безубыточности по скидке и выборка строк."""
+
+    def __init__(self, cube, rollups, ranking, losses, discounts, breakeven, sample, rows, sample_size=MAX_POINTS):
+        self.cube = cube
+        self.rollups = rollups
+        self.ranking = ranking
+        self.losses = losses
+        self.discounts = discounts
+        self.breakeven = breakeven
+        self.sample = sample
+        self.rows = rows
+        self.sample_size = sample_size
+
+    @classmethod
+    def from_frame(cls, df, sample_size=MAX_POINTS, first=None, ranking_mode=None):
+        """Агрегаты таблицы df; first — признак первой строки заказа, по умолчанию внутри df.
+
+        ranking_mode — режим рейтинга клиентов, по умолчанию SUPERSTORE_RANKING
+        (см. superstore.ranking).
+        """
+        if first is None:
+            first = first_lines(df)
+        with instrument.span('aggregate', 'aggregates.build', rows=len(df)):
+            return cls._from_frame(df, sample_size, first, ranking_mode)
+
+    @classmethod
+    def _from_frame(cls, df, sample_size, first, ranking_mode):
+        ranking = ranking_from_frame(df, first, ranking_mode)
+        # В потоковом режиме рейтинга счётчики клиентов в кубе тоже ограничены
+        customer_capacity = None if ranking.mode == 'exact' else CAPACITY
+        discounts = df.groupby(['Discount', 'is_loss']).size().rename('rows')
+        return cls(
+            cube=Cube.from_frame(df, customer_capacity),
+            rollups=Rollups.from_frame(df, first),
+            ranking=ranking,
+            losses=LossReport.from_frame(df),
+            discounts=discounts,
+            breakeven=BreakEven.from_frame(df),
+            sample=_bottom_k(_with_sample_key(df), sample_size),
+            rows=len(df),
+            sample_size=sample_size,
+        )
+
+    @classmethod
+    def merge_all(cls, parts):
+        """Слияние всех частей сразу: по одной конкатенации и группировке на таблицу,
+        а не цепочка попарных merge, каждый из которых заново перебирает накопленное."""
+        modes = sorted({part.ranking.mode for part in parts})
+        if len(modes) > 1:
+            raise ValueError(
+                f"Нельзя объединить агрегаты с разными режимами рейтинга клиентов: {', '.join(modes)}"
+            )
+        discounts = pd.concat([part.discounts for part in parts])
+        sample = pd.concat([part.sample for part in parts], ignore_index=True)
+        sample_size = max(part.sample_size for part in parts)
+        return cls(
+            cube=Cube.merge_all([part.cube for part in parts]),
+            rollups=Rollups.merge_all([part.rollups for part in parts]),
+            ranking=type(parts[0].ranking).merge_all([part.ranking for part in parts]),
+            losses=LossReport.merge_all([part.losses for part in parts]),
+            discounts=discounts.groupby(level=discounts.index.names).sum(),
+            breakeven=BreakEven.merge_all([part.breakeven for part in parts]),
+            sample=_bottom_k(sample, sample_size),
+            rows=sum(part.rows for part in parts),
+            sample_size=sample_size,
+        )
+
+    def to_files(self):
+        """Файлы каталога агрегатов для load(): по Parquet-файлу на таблицу и aggregates.json, имя -> байты."""
+        frames = {
+            'cube_cells': self.cube.cells.reset_index(),
+            'cube_customers': self.cube.customers.reset_index(),
+            'rollup_days': self.rollups.days.reset_index(),
+            'loss_rollup': self.losses.rollup.reset_index(),
+            'loss_top_rows': self.losses.top_rows.reset_index(drop=True),
+            'discounts': self.discounts.reset_index(),
+            'breakeven_cells': self.breakeven.cells.reset_index(),
+            'sample': self.sample,
+        }
+        if self.cube.customer_reduction is not None:
+            frames['cube_customer_reduction'] = self.cube.customer_reduction.rename('rows').reset_index()
+        ranking_frames, ranking_meta = self.ranking.to_frames()
+        frames.update(ranking_frames)
+        files = {f"{name}.parquet": parquet_bytes(frame, index=False) for name, frame in frames.items()}
+        meta = {
+            'ranking': ranking_meta,
+            'customer_capacity': self.cube.customer_capacity,
+            'rows': self.rows,
+            'sample_size': self.sample_size,
+            'loss_count': self.losses.count,
+            'loss_discount_sum': self.losses.discount_sum,
+            'loss_discount_count': self.losses.discount_count,
+            'loss_top_k': self.losses.top_k,
+        }
+        files['aggregates.json'] = json.dumps(meta, indent=2).encode()
+        return files
+
+    @classmethod
+    def load(cls, directory):
+        directory = Path(directory)
+        meta = json.loads((directory / 'aggregates.json').read_text())
+
+        def read(name):
+            return pd.read_parquet(directory / f"{name}.parquet")
+
+        customers = read('cube_customers')
+        reduction = None
+        if (directory / 'cube_customer_reduction.parquet').exists():
+            reduction = read('cube_customer_reduction').set_index(['Region', 'Year'])['rows']
+        cube = Cube(
+            read('cube_cells').set_index(DIMENSIONS),
+            customers.set_index(list(customers.columns[:-1]))['rows'],
+            reduction,
+            meta['customer_capacity'],
+        )
+        ranking_meta = meta['ranking']
+        names = ['ranking_counts'] if ranking_meta['mode'] == 'exact' else ['ranking_weights']
+        losses = LossReport(
+            count=meta['loss_count'],
+            top_rows=read('loss_top_rows'),
+            rollup=read('loss_rollup').set_index(LOSS_KEYS)['Profit'],
+            discount_sum=meta['loss_discount_sum'],
+            discount_count=meta['loss_discount_count'],
+            top_k=meta['loss_top_k'],
+        )
+        return cls(
+            cube=cube,
+            rollups=Rollups(read('rollup_days').set_index(['Region', 'day'])),
+            ranking=load_ranking({name: read(name) for name in names}, ranking_meta),
+            losses=losses,
+            discounts=read('discounts').set_index(['Discount', 'is_loss'])['rows'],
+            breakeven=BreakEven(read('breakeven_cells').set_index(BREAKEVEN_LEVELS + ['discount_bin', 'ratio_bin'])),
+            sample=read('sample'),
+            rows=meta['rows'],
+            sample_size=meta['sample_size'],
+        )
+
+    def top_customers_by_orders(self, n=10):
+        """Клиенты с наибольшим числом уникальных заказов (оценка в потоковом режиме)."""
+        return self.ranking.top(n).set_index('Customer Name')['orders'].rename('Order ID')
+
+    def discount_frequencies(self):
+        """Частоты скидок по признаку убытка — вход для гистограммы с весами."""
+        return self.discounts.reset_index()
+
+
+def parquet_bytes(frame, index=None):
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, index=index)
+    return buffer.getvalue()
+
+
+def fold(parts, batch=MERGE_BATCH):
+    """Сливает поток частичных агрегатов пачками по batch; None, если частей нет.
+
+    Накопленный итог входит в каждую пачку один раз, поэтому цена слияния —
+    порядка (число частей / batch) × размер итога, а не число частей × размер итога.
+    """
+    pending = []
+    for part in parts:
+        pending.append(part)
+        if len(pending) >= batch:
+            pending = [Aggregates.merge_all(pending)]
+    if not pending:
+        return None
+    return pending[0] if len(pending) == 1 else Aggregates.merge_all(pending)
+
+
+class SeenOrders:
+    """Order ID уже свёрнутых частей: заказ, начатый в прошлой порции, не считается снова.
+
+    У заказа одна дата, один клиент и один регион, поэтому число заказов
+    в любой группе по этим ключам — сумма признаков первой строки.
+
+    Хранятся 64-битные хэши Order ID в отсортированном массиве: память растёт
+    на 8 байт на заказ (20 МБ на 2,5 млн заказов), а не ограничена порцией.
+    Вероятность совпадения хэшей двух заказов при 10 млн заказов — около 3e-6.
+    """
+
+    def __init__(self):
+        self.hashes = np.empty(0, dtype='uint64')
+
+    def first_lines(self, df):
+        codes, uniques = pd.factorize(df['Order ID'])
+        hashes = pd.util.hash_array(np.asarray(uniques, dtype=object).astype(str))
+        positions = np.searchsorted(self.hashes, hashes)
+        known = np.zeros(len(hashes), dtype=bool)
+        inside = positions < len(self.hashes)
+        known[inside] = self.hashes[positions[inside]] == hashes[inside]
+        fresh = np.unique(hashes[~known])
+        self.hashes = np.insert(self.hashes, np.searchsorted(self.hashes, fresh), fresh)
+        first = np.zeros(len(codes), dtype=bool)
+        first[np.unique(codes, return_index=True)[1]] = True
+        return first & ~known[codes]
+
+
+def _with_sample_key(df):
+    key = pd.util.hash_pandas_object(df[SAMPLE_HASH_COLUMNS], index=False)
+    return df[SAMPLE_COLUMNS].assign(_key=key.to_numpy())
+
+
+def _bottom_k(sample, k):
+    """Строки с k наименьшими ключами: выборка, которая не зависит от разбиения на части."""
+    if len(sample) > k:
+        sample = sample.nsmallest(k, '_key')
+    return sample.sort_values('_key', ignore_index=True)
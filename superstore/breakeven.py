@@ -0,0 +1,172 @@
+"""Точки безубыточности по скидке для категорий и подкатегорий.
+
+Строки один раз раскладываются по ячейкам (категория, подкатегория,
+корзина скидки, корзина Profit Ratio) с числом строк, убыточных строк,
+суммой скидки и суммой прибыли. Всё остальное — вероятность убытка, средняя прибыль,
+квантили рентабельности и сама точка безубыточности — считается
+матричными операциями по этим ячейкам. Ячейки складываются через merge_all,
+поэтому при обновлении данных пересчитывается только новая порция.
+"""
+import numpy as np
+import pandas as pd
+
+from . import instrument
+
+LEVELS = ['Category', 'Sub-Category']
+# Корзины скидки по 5 п. п.: 0.15 и 0.32 попадают в свои корзины, как на гистограмме
+DISCOUNT_EDGES = np.linspace(0.0, 1.0, 21)
+# Гистограмма Profit Ratio, по которой оцениваются квантили; крайние значения прижимаются к краям
+RATIO_EDGES = np.linspace(-3.0, 1.0, 81)
+QUANTILES = (0.1, 0.5, 0.9)
+# Дальше стольких корзин не интерполируем: шаг скидок в выгрузке — 10 п. п., то есть две корзины.
+# Близость решают номера корзин, а не средние скидки: 0.32 в корзине 30% сдвигает её среднее выше 0.3
+MAX_INTERPOLATION_BINS = 2
+
+
+class BreakEven:
+    """Ячейки rows/losses/discount/profit по LEVELS × корзина скидки × корзина Profit Ratio."""
+
+    def __init__(self, cells):
+        self.cells = cells
+
+    @classmethod
+    def from_frame(cls, df):
+        with instrument.span('aggregate', 'breakeven.build', rows=len(df)):
+            return cls._from_frame(df)
+
+    @classmethod
+    def _from_frame(cls, df):
+        cells = (
+            df[LEVELS + ['Profit', 'is_loss']]
+            .assign(
+                discount_bin=_bin(df['Discount'], DISCOUNT_EDGES),
+                ratio_bin=_bin(df['Profit Ratio'], RATIO_EDGES),
+                rows=1,
+                losses=df['is_loss'].astype('int64'),
+                discount=df['Discount'].astype('float64'),
+            )
+            .groupby(LEVELS + ['discount_bin', 'ratio_bin'], observed=True)[['rows', 'losses', 'discount', 'Profit']]
+            .sum()
+        )
+        return cls(cells)
+
+    @classmethod
+    def merge_all(cls, parts):
+        cells = pd.concat([part.cells for part in parts])
+        return cls(cells.groupby(level=cells.index.names, observed=True).sum())
+
+    def curves(self, level='Category'):
+        """По группе level и корзине скидки: строки, средняя скидка, вероятность убытка, средняя прибыль и квантили Profit Ratio."""
+        with instrument.span('aggregate', 'breakeven.curves') as record:
+            curves = self._curves(level)
+            record['rows'] = len(curves)
+        return curves
+
+    def _curves(self, level):
+        keys = [level, 'discount_bin']
+        totals = self.cells.groupby(level=keys, observed=True)[['rows', 'losses', 'discount', 'Profit']].sum()
+        histogram = (
+            self.cells['rows']
+            .groupby(level=keys + ['ratio_bin'], observed=True).sum()
+            .unstack('ratio_bin', fill_value=0)
+            .reindex(index=totals.index, columns=range(len(RATIO_EDGES) - 1), fill_value=0)
+        )
+
+        bins = totals.index.get_level_values('discount_bin').to_numpy()
+        curves = pd.DataFrame({
+            level: totals.index.get_level_values(level).astype(str),
+            'discount_from': DISCOUNT_EDGES[bins],
+            'discount_to': DISCOUNT_EDGES[bins + 1],
+            'rows': totals['rows'].to_numpy(),
+            'mean_discount': (totals['discount'] / totals['rows']).to_numpy(),
+            'loss_probability': (totals['losses'] / totals['rows']).to_numpy(),
+            'mean_profit': (totals['Profit'] / totals['rows']).to_numpy(),
+        })
+        for q, values in zip(QUANTILES, _histogram_quantiles(histogram.to_numpy(), RATIO_EDGES, QUANTILES)):
+            curves[f"ratio_q{round(q * 100)}"] = values
+        return curves
+
+    def break_even(self, level='Category'):
+        """Скидка, при которой средняя прибыль группы переходит через ноль.
+
+        Точки кривой — средние скидки корзин: скидки выгрузки лежат на левых
+        краях корзин, поэтому середины корзин сдвинули бы порог на 2,5 п. п.
+        Между последней прибыльной и первой убыточной корзиной берётся
+        линейная интерполяция, если их номера отличаются не больше чем на
+        MAX_INTERPOLATION_BINS. Иначе между ними нет данных, и
+        break_even_discount — NaN, а переход лежит где-то в
+        [break_even_from, break_even_to] между этими средними скидками.
+        Группа, убыточная уже в первой корзине, получает её среднюю скидку.
+        У интерполированной точки обе границы равны ей. Всё NaN — группа
+        прибыльна при любой встреченной скидке. first_losing_bin — начало
+        корзины, где убыточных строк становится больше половины.
+        """
+        curves = self.curves(level)
+        groups = curves[level].unique()
+        width = len(DISCOUNT_EDGES) - 1
+        rows = pd.Index(groups).get_indexer(curves[level])
+        cols = np.searchsorted(DISCOUNT_EDGES, curves['discount_from'].to_numpy())
+        mean_profit = _grid(len(groups), width, rows, cols, curves['mean_profit'])
+        loss_probability = _grid(len(groups), width, rows, cols, curves['loss_probability'])
+        mean_discount = _grid(len(groups), width, rows, cols, curves['mean_discount'])
+
+        losing = mean_profit <= 0
+        has_loss = losing.any(axis=1)
+        first = losing.argmax(axis=1)
+        # Последняя непустая корзина перед первой убыточной (она прибыльная по построению)
+        seen = np.where(~np.isnan(mean_profit), np.arange(width), -1)
+        last_seen = np.maximum.accumulate(seen, axis=1)
+        prev = np.where(first > 0, last_seen[np.arange(len(groups)), np.maximum(first - 1, 0)], -1)
+
+        g = np.arange(len(groups))
+        x1, y1 = mean_discount[g, first], mean_profit[g, first]
+        x0 = mean_discount[g, np.maximum(prev, 0)]
+        y0 = mean_profit[g, np.maximum(prev, 0)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing = np.where(prev >= 0, x0 + y0 * (x1 - x0) / (y0 - y1), x1)
+        gap = (prev >= 0) & (first - prev > MAX_INTERPOLATION_BINS)
+        lower = np.where(gap, x0, crossing)
+        upper = np.where(gap, x1, crossing)
+        crossing = np.where(has_loss & ~gap, crossing, np.nan)
+
+        majority = loss_probability > 0.5
+        first_losing = np.where(majority.any(axis=1), DISCOUNT_EDGES[majority.argmax(axis=1)], np.nan)
+        return pd.DataFrame({
+            level: groups,
+            'break_even_discount': crossing,
+            'break_even_from': np.where(has_loss, lower, np.nan),
+            'break_even_to': np.where(has_loss, upper, np.nan),
+            'first_losing_bin': first_losing,
+            'rows': curves.groupby(level, sort=False)['rows'].sum().reindex(groups).to_numpy(),
+        }).sort_values(['break_even_from', 'break_even_discount'], ignore_index=True)
+
+
+def _bin(values, edges):
+    # Небольшой допуск, чтобы 0.7 во float32 (0.69999...) не уходило в соседнюю корзину
+    codes = np.searchsorted(edges, values.to_numpy(dtype='float64') + 1e-6, side='right') - 1
+    return np.clip(codes, 0, len(edges) - 2)
+
+
+def _grid(n_rows, n_cols, rows, cols, values):
+    grid = np.full((n_rows, n_cols), np.nan)
+    grid[rows, cols] = values.to_numpy()
+    return grid
+
+
+def _histogram_quantiles(counts, edges, quantiles):
+    """Квантили по строкам гистограммы counts[n, bins] с линейной интерполяцией внутри корзины."""
+    cumulative = counts.cumsum(axis=1)
+    total = cumulative[:, -1:]
+    result = []
+    for q in quantiles:
+        target = q * total
+        index = (cumulative < target).sum(axis=1, keepdims=True)
+        index = np.minimum(index, counts.shape[1] - 1)
+        before = np.take_along_axis(cumulative, index, axis=1) - np.take_along_axis(counts, index, axis=1)
+        inside = np.take_along_axis(counts, index, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(inside > 0, (target - before) / inside, 0.0)
+        width = edges[1] - edges[0]
+        value = edges[index] + fraction * width
+        result.append(np.where(total > 0, value, np.nan)[:, 0])
+    return result
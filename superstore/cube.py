@@ -0,0 +1,149 @@
+"""Предагрегированный куб для страницы «Графики»."""
+import pandas as pd
+
+from . import instrument
+from .ranking import compress_groups
+
+DIMENSIONS = ['Region', 'Year', 'Month', 'Category', 'Sub-Category']
+MEASURES = ['Sales', 'Profit', 'rows', 'losses']
+# Уровни, внутри которых сжимаются счётчики клиентов
+GROUP_LEVELS = ['Region', 'Year']
+
+
+class Cube:
+    """Суммы продаж/прибыли и счётчики строк по измерениям DIMENSIONS.
+
+    Любой срез по региону и году стоит порядка числа ячеек куба,
+    а не числа транзакций.
+
+    Если задан customer_capacity, строки клиентов в каждой паре регион–год
+    хранятся счётчиками Мисры–Гриса (см. superstore.ranking): не больше
+    customer_capacity клиентов, а срезанные пороги копятся в customer_reduction.
+    Куб одной порции не сжимается: порция и так в памяти, а порог каждой
+    порции только расширил бы customer_reduction. Сжатие — в merge_all.
+    """
+
+    def __init__(self, cells, customers, customer_reduction=None, customer_capacity=None):
+        self.cells = cells
+        self.customers = customers
+        self.customer_reduction = customer_reduction
+        self.customer_capacity = customer_capacity
+
+    @classmethod
+    def from_frame(cls, df, customer_capacity=None):
+        with instrument.span('aggregate', 'cube.build', rows=len(df)):
+            return cls._from_frame(df, customer_capacity)
+
+    @classmethod
+    def _from_frame(cls, df, customer_capacity):
+        cells = (
+            df.assign(rows=1, losses=df['is_loss'].astype('int64'))
+            .groupby(DIMENSIONS, observed=True)[MEASURES]
+            .sum()
+            .sort_index()
+        )
+        customers = (
+            df.groupby(['Region', 'Year', 'Customer Name'], observed=True)
+            .size()
+            .rename('rows')
+            .sort_index()
+        )
+        return cls(cells, customers, customer_capacity=customer_capacity)
+
+    @classmethod
+    def merge_all(cls, cubes):
+        """Куб по объединению данных всех кубов: одна конкатенация и одна группировка."""
+        cells = pd.concat([cube.cells for cube in cubes])
+        merged = cls(
+            cells.groupby(level=DIMENSIONS, observed=True).sum().sort_index(),
+            sum_by_levels([cube.customers for cube in cubes]),
+        )
+        reductions = [cube.customer_reduction for cube in cubes if cube.customer_reduction is not None]
+        reduction = pd.concat(reductions).groupby(level=GROUP_LEVELS, observed=True).sum() if reductions else None
+        capacity = max((cube.customer_capacity for cube in cubes if cube.customer_capacity), default=None)
+        return merged._compress_customers(capacity, reduction)
+
+    def _compress_customers(self, capacity, reduction):
+        if capacity is None:
+            return self
+        customers, thresholds = compress_groups(self.customers, GROUP_LEVELS, capacity)
+        if reduction is not None:
+            thresholds = pd.concat([reduction, thresholds]).groupby(level=GROUP_LEVELS, observed=True).sum()
+        return Cube(self.cells, customers.sort_index(), thresholds.sort_index(), capacity)
+
+    @property
+    def regions(self):
+        return list(self.cells.index.get_level_values('Region').unique())
+
+    @property
+    def years(self):
+        years = self.cells.index.get_level_values('Year')
+        return int(years.min()), int(years.max())
+
+    def slice(self, region=None, year=None):
+        """Ячейки куба для выбранного региона и/или года."""
+        return _select(self.cells, region, year)
+
+    def category_totals(self, region=None, year=None):
+        cells = self.slice(region, year)
+        totals = cells.groupby(level='Category', observed=True)[['Sales', 'Profit']].sum()
+        return totals.rename(index=str).reset_index()
+
+    def region_totals(self, year=None):
+        cells = self.slice(year=year)
+        totals = cells.groupby(level='Region', observed=True)[['Sales', 'Profit']].sum()
+        return totals.rename(index=str).reset_index()
+
+    def monthly_sales(self, region=None, year=None):
+        cells = self.slice(region, year)
+        monthly = cells.groupby(level='Month', observed=True)['Sales'].sum().reset_index()
+        monthly['Month'] = monthly['Month'].astype(str)
+        return monthly
+
+    def top_customers(self, region=None, year=None, n=10):
+        """Клиенты с наибольшим числом строк заказов в срезе."""
+        counts = _select(self.customers, region, year)
+        counts = counts.groupby(level='Customer Name', observed=True).sum()
+        return counts.nlargest(n).rename(index=str)
+
+    def customer_error(self, region=None, year=None):
+        """На сколько строк top_customers может занижать счётчик клиента в срезе (0 — точно)."""
+        if self.customer_reduction is None:
+            return 0
+        return int(_select(self.customer_reduction, region, year).sum())
+
+
+def sum_by_levels(parts):
+    """Сумма серий с одинаковыми уровнями индекса, отсортированная по ним.
+
+    Серии склеиваются как таблицы, а не как MultiIndex: append индексов
+    с категориальными уровнями из разных порций (разные словари клиентов)
+    перекодирует уровни на каждой части и оказывается в разы медленнее.
+    """
+    levels = list(parts[0].index.names)
+    frame = pd.concat([part.reset_index() for part in parts], ignore_index=True)
+    return frame.groupby(levels, observed=True)[parts[0].name].sum()
+
+
+def _select(frame, region, year):
+    levels, keys = [], []
+    if region is not None:
+        levels.append('Region')
+        keys.append(region)
+    if year is not None:
+        levels.append('Year')
+        keys.append(year)
+    if not levels:
+        return frame
+    with instrument.span('aggregate', 'cube.slice') as record:
+        try:
+            selected = frame.xs(tuple(keys), level=levels, drop_level=False)
+        except KeyError:
+            selected = frame.iloc[:0]
+        record['rows'] = len(selected)
+    return selected
+
+
+def row_positions(df, keys=('Region', 'Year')):
+    """Позиции строк для каждой комбинации ключей, чтобы брать срез без масок."""
+    return df.groupby(list(keys), observed=True).indices
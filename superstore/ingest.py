@@ -0,0 +1,216 @@
+"""Загрузка исходной книги Excel и кэширование очищенного снимка в Parquet."""
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from . import instrument
+from .aggregates import Aggregates, SeenOrders, fold
+from .schema import apply_schema
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE = ROOT / 'data' / 'Tableau Superstore.xlsx'
+CACHE_DIR = ROOT / 'data' / '.cache'
+
+# Строк в одной порции при потоковой загрузке
+CHUNK_SIZE = 50_000
+
+# Увеличивать при любом изменении очистки, чтобы старые снимки не подхватывались
+SNAPSHOT_VERSION = 2
+
+
+def source_fingerprint(path=SOURCE):
+    """Отпечаток исходного файла: размер и время изменения."""
+    stat = Path(path).stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def clean(df):
+    """Приводит сырые колонки к типам схемы (см. superstore.schema)."""
+    with instrument.span('transform', 'clean', rows=len(df)):
+        return apply_schema(df)
+
+
+def read_source(path=SOURCE):
+    """Полный разбор книги Excel без кэша."""
+    with instrument.span('load', 'read_excel') as record:
+        raw = pd.read_excel(path)
+        record['rows'] = len(raw)
+    return clean(raw)
+
+
+def snapshot_path(path=SOURCE, cache_dir=CACHE_DIR):
+    path = Path(path)
+    name = f"{path.stem}-v{SNAPSHOT_VERSION}-{source_fingerprint(path)}.parquet"
+    return Path(cache_dir) / name
+
+
+def build_snapshot(path=SOURCE, cache_dir=CACHE_DIR):
+    """Разбирает книгу и атомарно записывает снимок, удаляя устаревшие."""
+    path = Path(path)
+    target = snapshot_path(path, cache_dir)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    df = read_source(path)
+    tmp = _temp_path(target)
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, target)
+
+    for stale in target.parent.glob(f"{path.stem}-*.parquet"):
+        if stale != target:
+            stale.unlink(missing_ok=True)
+    return df
+
+
+def _temp_path(target):
+    """Свой временный файл рядом с target: процессы, собирающие снимок одновременно, не перепишут чужой."""
+    with tempfile.NamedTemporaryFile(dir=target.parent, prefix=f"{target.name}.", suffix='.tmp', delete=False) as tmp:
+        return Path(tmp.name)
+
+
+def load_dataset(path=SOURCE, cache_dir=CACHE_DIR):
+    """Читает снимок, если он соответствует исходнику, иначе пересобирает его."""
+    target = snapshot_path(path, cache_dir)
+    if target.exists():
+        with instrument.span('load', 'read_snapshot') as record:
+            df = pd.read_parquet(target)
+            record['rows'] = len(df)
+        return df
+    return build_snapshot(path, cache_dir)
+
+
+def shared_path(path=SOURCE, cache_dir=CACHE_DIR):
+    return snapshot_path(path, cache_dir).with_suffix('.arrow')
+
+
+def build_shared(path=SOURCE, cache_dir=CACHE_DIR):
+    """Несжатая копия снимка в формате Arrow IPC, которую можно отображать в память."""
+    import pyarrow as pa
+
+    target = shared_path(path, cache_dir)
+    table = pa.Table.from_pandas(load_dataset(path, cache_dir), preserve_index=False)
+    tmp = _temp_path(target)
+    with pa.OSFile(str(tmp), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, target)
+
+    for stale in target.parent.glob(f"{Path(path).stem}-*.arrow"):
+        if stale != target:
+            stale.unlink(missing_ok=True)
+    return target
+
+
+def load_shared_dataset(path=SOURCE, cache_dir=CACHE_DIR):
+    """Таблица поверх отображённого в память Arrow-файла.
+
+    Числовые колонки, даты и коды категорий не копируются: это read-only
+    представления страниц файла, общие для всех сессий и процессов хоста.
+    Копируются только словари категорий и колонка Month.
+    """
+    import pyarrow as pa
+
+    target = shared_path(path, cache_dir)
+    if not target.exists():
+        build_shared(path, cache_dir)
+    with instrument.span('load', 'map_shared') as record:
+        table = pa.ipc.open_file(pa.memory_map(str(target))).read_all()
+        df = _mapped_frame(table)
+        record['rows'] = len(df)
+    return df
+
+
+def _mapped_frame(table):
+    """to_pandas, у которого категории собраны прямо на индексах словарей Arrow.
+
+    Оставит ли to_pandas коды представлением буфера файла, зависит от версии
+    pyarrow; здесь это гарантировано. Series.cat.codes всё равно отдаёт
+    копию, общий буфер видно только через .array.codes. Колонки с пропусками
+    или из нескольких кусков конвертируются обычным путём.
+    """
+    import pyarrow as pa
+
+    mapped = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if pa.types.is_dictionary(column.type) and column.num_chunks == 1 and column.null_count == 0:
+            chunk = column.chunk(0)
+            categories = pd.Categorical.from_codes(
+                chunk.indices.to_numpy(zero_copy_only=True),
+                categories=pd.Index(chunk.dictionary.to_pandas()),
+                ordered=column.type.ordered,
+                validate=False,
+            )
+            mapped[name] = pd.Series(categories, name=name, copy=False)
+    df = table.drop_columns(list(mapped)).to_pandas(split_blocks=True)
+    for position, name in enumerate(table.column_names):
+        if name in mapped:
+            df.insert(position, name, mapped[name])
+    return df
+
+
+def iter_excel_chunks(path, chunksize=CHUNK_SIZE):
+    """Читает книгу построчно в режиме read-only openpyxl и отдаёт порции по chunksize строк.
+
+    Полностью пустые строки (например, отформатированные строки в конце
+    листа) пропускаются, как и в pd.read_excel.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = list(next(rows))
+        buffer = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            buffer.append(row)
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=header)
+    finally:
+        workbook.close()
+
+
+def iter_parquet_chunks(path, chunksize=CHUNK_SIZE):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def iter_chunks(path, chunksize=CHUNK_SIZE):
+    """Сырые порции строк из .xlsx, .csv или .parquet."""
+    suffix = Path(path).suffix.lower()
+    if suffix in ('.xlsx', '.xlsm'):
+        return iter_excel_chunks(path, chunksize)
+    if suffix == '.csv':
+        return pd.read_csv(path, chunksize=chunksize)
+    if suffix == '.parquet':
+        return iter_parquet_chunks(path, chunksize)
+    raise ValueError(f"Неподдерживаемый формат выгрузки: {path}")
+
+
+def stream_aggregates(path=SOURCE, chunksize=CHUNK_SIZE):
+    """Агрегаты дашборда без загрузки всей таблицы: каждая порция очищается и сворачивается.
+
+    Пиковая память — порция, пачка частичных агрегатов (см.
+    superstore.aggregates.fold) и 8 байт на каждый уже встреченный заказ
+    (см. SeenOrders): эта часть растёт с числом заказов, а не с порцией.
+    """
+    seen = SeenOrders()
+
+    def parts():
+        for chunk in iter_chunks(path, chunksize):
+            chunk = clean(chunk)
+            yield Aggregates.from_frame(chunk, first=seen.first_lines(chunk))
+
+    with instrument.span('load', 'stream_aggregates') as record:
+        total = fold(parts())
+        record['rows'] = total.rows if total is not None else 0
+    if total is None:
+        raise ValueError(f"В выгрузке нет строк: {path}")
+    return total
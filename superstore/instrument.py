@@ -0,0 +1,124 @@
+"""Замеры горячих участков: загрузка, преобразования, агрегаты и рендер.
+
+Пока трассировка не запущена (traced), span ничего не делает, поэтому вызовы
+можно оставлять в коде без накладных расходов. Записи текущего прогона
+дописываются JSON-строками в LOG_PATH.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LOG_PATH = Path(os.environ.get('SUPERSTORE_PROFILE_LOG', ROOT / 'logs' / 'profile.jsonl'))
+
+_current = ContextVar('superstore_tracer', default=None)
+_write_lock = threading.Lock()
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def env_enabled():
+    return os.environ.get('SUPERSTORE_PROFILE', '').lower() in ('1', 'true', 'yes')
+
+
+def rss_bytes():
+    """Текущий RSS процесса (Linux); на других системах — None."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def private_bytes():
+    """Резидентная память процесса за вычетом разделяемых страниц файлов (Linux), иначе None.
+
+    Страницы отображённого в память снимка сюда не входят: их делят все процессы.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            fields = statm.read().split()
+        return (int(fields[1]) - int(fields[2])) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Tracer:
+    """Записи одного прогона страницы: страница, фильтры и замеры по шагам."""
+
+    def __init__(self, page):
+        self.page = page
+        self.filters = {}
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+
+    @contextmanager
+    def span(self, kind, name, rows=None):
+        record = {'kind': kind, 'name': name, 'rows': rows}
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            rss_after = rss_bytes()
+            record.update({
+                'ts': datetime.now(timezone.utc).isoformat(),
+                'run_id': self.run_id,
+                'page': self.page,
+                'filters': dict(self.filters),
+                'seconds': round(time.perf_counter() - start, 6),
+                'rss_before': rss_before,
+                'rss_after': rss_after,
+                'rss_delta': None if rss_before is None or rss_after is None else rss_after - rss_before,
+            })
+            self.records.append(record)
+
+    def flush(self, path=LOG_PATH):
+        if not self.records:
+            return
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = ''.join(json.dumps(r, ensure_ascii=False, default=str) + '\n' for r in self.records)
+        with _write_lock, open(path, 'a', encoding='utf-8') as log:
+            log.write(lines)
+
+
+@contextmanager
+def traced(page, enabled=True, path=LOG_PATH):
+    """Запускает трассировку на время блока; вложенный вызов переиспользует внешнюю."""
+    active = _current.get()
+    if not enabled or active is not None:
+        yield active
+        return
+    tracer = Tracer(page)
+    token = _current.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current.reset(token)
+        tracer.flush(path)
+
+
+@contextmanager
+def span(kind, name, rows=None):
+    """Замер шага kind ('load', 'transform', 'aggregate', 'render'); без трассировки — no-op.
+
+    Отдаёт словарь записи, в который можно дописать, например, rows после вычисления.
+    """
+    tracer = _current.get()
+    if tracer is None:
+        yield {}
+        return
+    with tracer.span(kind, name, rows) as record:
+        yield record
+
+
+def set_filters(**filters):
+    tracer = _current.get()
+    if tracer is not None:
+        tracer.filters.update(filters)
@@ -0,0 +1,134 @@
+"""Ключи загруженных строк и заказов для инкрементального обновления артефакта.
+
+Одна SQLite-база на каталог артефактов (keys.sqlite) с индексами по ключу:
+в таблице lines — 64-битный ключ строки, версия, в которой строка загружена,
+и число её копий; в таблице orders — Order ID и версия. Полный расчёт
+начинает новую линию версий (base), обновления продолжают линию текущей
+версии, и история версии — записи её линии с версиями не новее её самой.
+Обновление спрашивает базу только о ключах своей порции и дописывает только
+новые записи: история не читается и не переписывается целиком.
+
+Ключ строки — Row ID, а если его нет в выгрузке — хэш Order ID, товара,
+даты, суммы и количества. В выгрузке встречаются строки, совпадающие по всем
+колонкам, поэтому ключи считаются с кратностью: из delta загружаются только
+копии сверх уже загруженных.
+"""
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Колонки ключа строки, если в выгрузке нет Row ID
+LINE_KEY_COLUMNS = ['Order ID', 'Product Name', 'Order Date', 'Sales', 'Quantity']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (version INTEGER PRIMARY KEY, base INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS lines (key INTEGER NOT NULL, version INTEGER NOT NULL, copies INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_lines ON lines (key, version);
+CREATE TABLE IF NOT EXISTS orders (order_id TEXT NOT NULL, version INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_orders ON orders (order_id, version);
+CREATE TEMP TABLE probe (value PRIMARY KEY);
+CREATE TEMP TABLE delta (key INTEGER PRIMARY KEY, copies INTEGER NOT NULL);
+"""
+
+
+def line_keys(df):
+    """64-битный ключ каждой строки: по Row ID или по колонкам LINE_KEY_COLUMNS."""
+    columns = ['Row ID'] if 'Row ID' in df.columns else LINE_KEY_COLUMNS
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy().view('int64')
+
+
+def version_number(version):
+    return int(version[1:])
+
+
+class KeyStore:
+    """Запись ключей версии version; base — первая версия её линии.
+
+    Записи прерванных запусков (версии не старше version) удаляются при
+    открытии. Всё записанное становится видно только после commit().
+    """
+
+    def __init__(self, path, version, base=None):
+        self.path = Path(path)
+        self.version = version_number(version)
+        self.con = sqlite3.connect(self.path)
+        self.con.executescript(SCHEMA)
+        if base is None:
+            self.base = self.version
+        else:
+            self.base = self.con.execute(
+                'SELECT base FROM versions WHERE version = ?', (version_number(base),),
+            ).fetchone()[0]
+        for table in ('versions', 'lines', 'orders'):
+            self.con.execute(f'DELETE FROM {table} WHERE version >= ?', (self.version,))
+        self.con.execute('INSERT INTO versions VALUES (?, ?)', (self.version, self.base))
+
+    def new_lines(self, df):
+        """Признак строк df, которых ещё нет в истории линии.
+
+        Копии одной строки нумеруются по всей delta: если в истории таких
+        строк c, загружаются копии начиная с (c+1)-й.
+        """
+        keys = line_keys(df)
+        unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        loaded = self._lookup(
+            unique,
+            'SELECT key, SUM(copies) FROM lines JOIN probe ON key = value '
+            'WHERE version BETWEEN ? AND ? GROUP BY key',
+            (self.base, self.version - 1),
+        )
+        before = self._lookup(unique, 'SELECT key, copies FROM delta JOIN probe ON key = value')
+        self.con.executemany(
+            'INSERT INTO delta VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET copies = copies + excluded.copies',
+            zip(unique.tolist(), counts.tolist()),
+        )
+        ordinal = before[inverse] + pd.Series(keys).groupby(keys).cumcount().to_numpy()
+        return ordinal >= loaded[inverse]
+
+    def first_lines(self, df):
+        """Признак первой строки заказов df, которых нет в истории линии и в уже записанных порциях."""
+        codes, uniques = pd.factorize(df['Order ID'])
+        uniques = np.asarray(uniques, dtype=object).astype(str)
+        seen = self._lookup(
+            uniques,
+            'SELECT DISTINCT order_id, 1 FROM orders JOIN probe ON order_id = value '
+            'WHERE version BETWEEN ? AND ?',
+            (self.base, self.version),
+        )
+        first = np.zeros(len(codes), dtype=bool)
+        first[np.unique(codes, return_index=True)[1]] = True
+        return first & (seen == 0)[codes]
+
+    def record(self, df, first):
+        """Записывает ключи строк df и Order ID тех из них, что отмечены в first."""
+        unique, counts = np.unique(line_keys(df), return_counts=True)
+        self.con.executemany(
+            'INSERT INTO lines VALUES (?, ?, ?)',
+            zip(unique.tolist(), [self.version] * len(unique), counts.tolist()),
+        )
+        orders = df.loc[np.asarray(first, dtype=bool), 'Order ID'].astype(str)
+        self.con.executemany('INSERT INTO orders VALUES (?, ?)', ((order, self.version) for order in orders))
+
+    def commit(self):
+        self.con.commit()
+
+    def prune(self, oldest):
+        """Удаляет записи, не входящие в историю версий начиная с oldest."""
+        oldest = version_number(oldest)
+        (floor,) = self.con.execute('SELECT MIN(base) FROM versions WHERE version >= ?', (oldest,)).fetchone()
+        for table in ('lines', 'orders'):
+            self.con.execute(f'DELETE FROM {table} WHERE version < ?', (floor,))
+        self.con.execute('DELETE FROM versions WHERE version < ?', (oldest,))
+        self.con.commit()
+
+    def close(self):
+        self.con.close()
+
+    def _lookup(self, values, sql, params=()):
+        """Значение из второй колонки запроса для каждого из values (0, если строки нет)."""
+        self.con.execute('DELETE FROM probe')
+        self.con.executemany('INSERT INTO probe VALUES (?)', ((value,) for value in values.tolist()))
+        found = dict(self.con.execute(sql, params).fetchall())
+        return np.fromiter((found.get(value, 0) for value in values.tolist()), dtype='int64', count=len(values))
@@ -0,0 +1,69 @@
+"""Аналитика убыточных заказов для страницы «Убытки»."""
+import pandas as pd
+
+from . import instrument
+from .cube import sum_by_levels
+from .schema import drop_unused_categories
+
+LOSS_KEYS = ['Category', 'Sub-Category', 'Customer Name', 'Region']
+
+
+class LossReport:
+    """Все сводки по убыткам, посчитанные по одному срезу убыточных строк.
+
+    Сами убыточные строки не хранятся: частичные отчёты передаются между
+    процессами и сливаются, а строки нужны только диаграмме рассеяния,
+    которая берёт их из таблицы или выборки.
+    """
+
+    def __init__(self, count, top_rows, rollup, discount_sum, discount_count, top_k=5):
+        self.count = count
+        self.top_rows = top_rows
+        self.rollup = rollup
+        self.discount_sum = discount_sum
+        self.discount_count = discount_count
+        self.top_k = top_k
+
+    @property
+    def avg_discount(self):
+        return self.discount_sum / self.discount_count if self.discount_count else float('nan')
+
+    @classmethod
+    def from_frame(cls, df, top_k=5):
+        with instrument.span('aggregate', 'losses.build', rows=len(df)):
+            return cls._from_frame(df, top_k)
+
+    @classmethod
+    def _from_frame(cls, df, top_k):
+        rows = df[df['is_loss']]
+        # Частичный отбор вместо полной сортировки; при равенстве — порядок исходных строк
+        top_index = rows['Profit'].nsmallest(top_k, keep='first').index
+        # Одна группировка по всем ключам, дальше сворачиваются уже маленькие группы
+        rollup = rows.groupby(LOSS_KEYS, observed=True)['Profit'].sum()
+        return cls(
+            count=int(rows['Order ID'].count()),
+            top_rows=drop_unused_categories(rows.loc[top_index]),
+            rollup=rollup,
+            discount_sum=float(rows['Discount'].astype('float64').sum()),
+            discount_count=int(rows['Discount'].count()),
+            top_k=top_k,
+        )
+
+    @classmethod
+    def merge_all(cls, reports):
+        top_k = max(report.top_k for report in reports)
+        top_rows = pd.concat([report.top_rows for report in reports], ignore_index=True)
+        return cls(
+            count=sum(report.count for report in reports),
+            top_rows=top_rows.loc[top_rows['Profit'].nsmallest(top_k, keep='first').index],
+            rollup=sum_by_levels([report.rollup for report in reports]),
+            discount_sum=sum(report.discount_sum for report in reports),
+            discount_count=sum(report.discount_count for report in reports),
+            top_k=top_k,
+        )
+
+    def by(self, key, n=None):
+        """Сумма убытков по ключу, от самых убыточных; n — взять только первые n."""
+        totals = self.rollup.groupby(level=key, observed=True).sum().rename(index=str)
+        totals = totals.nsmallest(n, keep='first') if n else totals.sort_values(kind='stable')
+        return totals.to_frame('Profit')
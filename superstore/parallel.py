@@ -0,0 +1,174 @@
+"""Параллельный расчёт агрегатов по временным партициям в пуле процессов.
+
+Транзакции делятся по году или месяцу заказа, каждая партиция сворачивается
+в Aggregates в отдельном процессе, а частичные агрегаты складываются через
+merge_all — так же точно, как при расчёте по всей таблице сразу. У заказа одна
+дата, поэтому заказ целиком попадает в одну партицию и считается в ней один раз.
+
+Соседние партиции группируются в задания (не больше одного на процесс,
+примерно поровну по объёму): каждое задание — одна свёртка и один частичный агрегат,
+так что число партиций не добавляет накладных расходов, а при одном процессе
+таблица сворачивается целиком, без нарезки. Мелкие партиции (месяцы) дают
+равномерные задания и при числе процессов больше числа лет.
+
+Партиции можно заранее разложить по файлам (write_partitions): тогда
+процесс читает с диска только свой срез, и таблица целиком не передаётся
+между процессами. Словари клиентов, товаров и заказов каждой партиции
+урезаются до её значений, так что частичные агрегаты малы и при передаче, и при слиянии,
+а сливаются они все сразу одним Aggregates.merge_all.
+
+Процессы пула запускаются через MP_CONTEXT, а не fork: пул создаётся и из
+многопоточного сервера Streamlit, где форк копирует чужие захваченные блокировки.
+"""
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+from .aggregates import Aggregates
+from .ingest import CACHE_DIR, CHUNK_SIZE, SNAPSHOT_VERSION, SOURCE, clean, iter_chunks, source_fingerprint
+from .schema import IDENTIFIERS, drop_unused_categories
+
+# Допустимые ключи партиционирования
+PARTITION_KEYS = ('Year', 'Month')
+# Способ запуска процессов пула: 'spawn' безопасен в многопоточном процессе и есть на всех платформах
+MP_CONTEXT = 'spawn'
+
+
+def partition_keys(df, by='Month'):
+    """Ключ партиции каждой строки: год или месяц заказа."""
+    if by not in PARTITION_KEYS:
+        raise ValueError(f"Партиционировать можно по {PARTITION_KEYS}, а не по {by!r}")
+    return df[by]
+
+
+def partition_labels(df, by='Month'):
+    """Метка партиции каждой строки для имени каталога: 2014 или 2014-03."""
+    return partition_keys(df, by).astype(str)
+
+
+def partitions_path(path=SOURCE, by='Month', cache_dir=CACHE_DIR):
+    path = Path(path)
+    name = f"{path.stem}-v{SNAPSHOT_VERSION}-{source_fingerprint(path)}-by-{by}"
+    return Path(cache_dir) / name
+
+
+def write_partitions(path=SOURCE, by='Month', cache_dir=CACHE_DIR, chunksize=CHUNK_SIZE):
+    """Раскладывает очищенные строки по файлам <by>=<метка>/part-NNNNN.parquet.
+
+    Выгрузка читается порциями; каталог появляется атомарно, устаревшие
+    раскладки того же исходника удаляются. Готовая раскладка переиспользуется.
+    """
+    path = Path(path)
+    target = partitions_path(path, by, cache_dir)
+    if target.exists():
+        return target
+
+    tmp = target.with_name(target.name + '.tmp')
+    shutil.rmtree(tmp, ignore_errors=True)
+    with instrument.span('load', 'write_partitions') as record:
+        rows = 0
+        for number, chunk in enumerate(iter_chunks(path, chunksize)):
+            chunk = clean(chunk)
+            for label, positions in chunk.groupby(partition_labels(chunk, by), sort=False).indices.items():
+                directory = tmp / f"{by}={label}"
+                directory.mkdir(parents=True, exist_ok=True)
+                chunk.take(positions).to_parquet(directory / f"part-{number:05d}.parquet", index=False)
+            rows += len(chunk)
+        record['rows'] = rows
+    os.replace(tmp, target)
+
+    for stale in target.parent.glob(f"{path.stem}-*-by-*"):
+        if stale != target:
+            shutil.rmtree(stale, ignore_errors=True)
+    return target
+
+
+def partition_dirs(directory):
+    return sorted(p for p in Path(directory).iterdir() if p.is_dir())
+
+
+def aggregate_partition(directories):
+    """Агрегаты группы партиций; выполняется в процессе пула."""
+    frames = [
+        pd.read_parquet(part)
+        for directory in directories
+        for part in sorted(Path(directory).glob('*.parquet'))
+    ]
+    return _aggregate(pd.concat(frames, ignore_index=True))
+
+
+def aggregate_partitions(directory, workers=None):
+    """Агрегаты по всем партициям каталога, посчитанные в workers процессах."""
+    parts = partition_dirs(directory)
+    workers = _workers(workers)
+    sizes = [sum(part.stat().st_size for part in directory.glob('*.parquet')) for directory in parts]
+    tasks = [[parts[i] for i in bucket] for bucket in group_partitions(sizes, workers)]
+    with instrument.span('aggregate', 'aggregate_partitions') as record:
+        total = _merge_all(_map(aggregate_partition, tasks, workers))
+        record['rows'] = total.rows
+        record['partitions'] = len(parts)
+        record['tasks'] = len(tasks)
+    return total
+
+
+def aggregate_frame(df, by='Month', workers=None):
+    """Агрегаты таблицы в памяти: процессам передаются только их партиции."""
+    workers = _workers(workers)
+    positions = list(df.groupby(partition_keys(df, by), sort=True, observed=True).indices.values())
+    buckets = group_partitions([len(rows) for rows in positions], workers)
+    with instrument.span('aggregate', 'aggregate_frame', rows=len(df)) as record:
+        if len(buckets) == 1:
+            # Одно задание — вся таблица: без нарезки и урезания словарей
+            total = Aggregates.from_frame(df)
+        else:
+            parts = (df.take(np.concatenate([positions[i] for i in bucket])) for bucket in buckets)
+            total = _merge_all(_map(_aggregate, parts, workers))
+        record['partitions'] = len(positions)
+        record['tasks'] = len(buckets)
+    return total
+
+
+def group_partitions(sizes, workers):
+    """Номера партиций по заданиям: не больше workers групп соседних партиций примерно равного объёма."""
+    if not sizes:
+        return []
+    bounds = np.cumsum(sizes)
+    # Задание заканчивается на партиции, после которой набрана очередная доля объёма
+    cuts = np.searchsorted(bounds, bounds[-1] * np.arange(1, workers) / workers, side='left') + 1
+    edges = np.unique(np.concatenate([[0], cuts, [len(sizes)]]).clip(0, len(sizes)))
+    return [list(range(start, end)) for start, end in zip(edges[:-1], edges[1:]) if end > start]
+
+
+def partitioned_aggregates(path=SOURCE, by='Month', workers=None, cache_dir=CACHE_DIR, chunksize=CHUNK_SIZE):
+    """Агрегаты исходника через раскладку по партициям на диске и пул процессов."""
+    return aggregate_partitions(write_partitions(path, by, cache_dir, chunksize), workers)
+
+
+def _workers(workers):
+    return workers or os.cpu_count() or 1
+
+
+def _map(fn, items, workers):
+    if workers == 1:
+        return list(map(fn, items))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context(MP_CONTEXT)) as pool:
+        # map сохраняет порядок партиций, поэтому результат слияния детерминирован
+        return list(pool.map(fn, items))
+
+
+def _aggregate(df):
+    # Словари измерений (регион, категория) малы и остаются общими, чтобы
+    # уровни слитых агрегатов сохранили тип category
+    return Aggregates.from_frame(drop_unused_categories(df, IDENTIFIERS))
+
+
+def _merge_all(parts):
+    if not parts:
+        raise ValueError("Нет ни одной партиции для агрегации")
+    return Aggregates.merge_all(parts)
@@ -0,0 +1,144 @@
+"""Функции отрисовки графиков дашборда: каждая рисует на переданной оси ax."""
+import numpy as np
+import seaborn as sns
+from matplotlib.patches import Patch
+
+from .scatter import LARGE_DATA_MODE, MAX_POINTS, choose_mode, density_grid, sample_label, stratified_sample
+
+
+def category_bars(ax, data, column, palette, xlabel):
+    sns.barplot(x=column, y='Category', data=data, palette=palette, ax=ax)
+    for index, row in data.reset_index(drop=True).iterrows():
+        ax.text(row[column] + 0.1, index, f"{row[column]:.0f}", color='black', va="center", fontsize=10)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Категория")
+
+
+def sales_and_profit_bars(ax, data):
+    sns.barplot(x='Sales', y='Category', data=data, label='Продажи', color='skyblue', ax=ax)
+    sns.barplot(x='Profit', y='Category', data=data, label='Прибыль', color='lightgreen', ax=ax)
+    ax.set_xlabel("Сумма")
+    ax.set_ylabel("Категория")
+    ax.legend()
+
+
+def simple_bars(ax, data, x, y, xlabel, ylabel):
+    sns.barplot(x=x, y=y, data=data, ax=ax)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+
+
+def monthly_line(ax, data, tick_step=1):
+    sns.lineplot(x='Month', y='Sales', data=data, marker='o', ax=ax)
+    ax.set_xlabel("Месяц")
+    ax.set_ylabel("Продажи")
+    if tick_step > 1:
+        ax.grid(True, linestyle='--', alpha=0.5)
+        ax.set_xticks(range(0, len(data), tick_step))
+        ax.set_xticklabels(data['Month'][::tick_step], fontsize=10)
+    ax.tick_params(axis='x', rotation=45)
+
+
+def period_line(ax, data, column, ylabel):
+    """Ряд из superstore.rollups: по оси x — даты начала периодов."""
+    ax.plot(data['period'], data[column], marker='o' if len(data) <= 60 else None)
+    ax.set_xlabel("Период")
+    ax.set_ylabel(ylabel)
+    ax.tick_params(axis='x', rotation=45)
+
+
+def discount_profit_scatter(ax, data, alpha, max_points=MAX_POINTS, large_mode=LARGE_DATA_MODE, population=None):
+    scatter(ax, data, 'Discount', 'Profit', hue='Category', alpha=alpha, max_points=max_points, large_mode=large_mode,
+            population=population)
+    ax.axhline(0, color='r', linestyle='--')
+    ax.set_xlabel("Скидка (%)")
+    ax.set_ylabel("Прибыль")
+
+
+def customers_barh(ax, counts, xlabel):
+    counts.plot(kind='barh', ax=ax, color='skyblue')
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Клиент")
+    ax.tick_params(labelsize=10)
+
+
+def loss_bars(ax, data, palette, xlabel):
+    sns.barplot(x=data.index, y=data['Profit'], data=data, palette=palette, ax=ax)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Общая сумма убытков")
+    ax.tick_params(axis='x', rotation=45)
+
+
+def discount_histogram(ax, data, avg_discount, weights=None):
+    sns.histplot(data=data, x='Discount', hue='is_loss', weights=weights, bins=20, multiple='stack', ax=ax)
+    ax.axvline(avg_discount, color='r', linestyle='--', label=f'Средняя скидка по убыткам: {avg_discount:.2%}')
+    ax.set_title('Распределение скидок: прибыльные vs убыточные заказы')
+    ax.set_xlabel('Скидка (%)')
+    ax.set_ylabel('Частота')
+    ax.legend()
+
+
+def loss_probability_lines(ax, curves, level='Category'):
+    """Доля убыточных строк по корзинам скидки для каждой группы."""
+    sns.lineplot(data=curves, x='discount_from', y='loss_probability', hue=level, marker='o', ax=ax)
+    ax.axhline(0.5, color='r', linestyle='--')
+    ax.set_xlabel('Скидка (%)')
+    ax.set_ylabel('Вероятность убытка')
+    ax.set_ylim(0, 1)
+
+
+def profit_ratio_scatter(ax, data, max_points=MAX_POINTS, large_mode=LARGE_DATA_MODE, population=None):
+    scatter(ax, data, 'Discount', 'Profit Ratio', alpha=0.6, max_points=max_points, large_mode=large_mode,
+            population=population)
+    ax.axhline(0, color='r', linestyle='--')
+    ax.set_xlabel('Скидка (%)')
+    ax.set_ylabel('Profit Ratio (%)')
+    ax.set_title('Скидка vs Рентабельность')
+
+
+def scatter(ax, data, x, y, hue=None, alpha=0.6, max_points=MAX_POINTS, large_mode=LARGE_DATA_MODE, population=None):
+    """Обычная диаграмма рассеяния, а на больших данных — выборка или карта плотности.
+
+    population — сколько строк стоит за data, если data уже выборка (по
+    умолчанию len(data)); когда на графике не все строки, это подписано.
+    """
+    population = len(data) if population is None else population
+    mode = choose_mode(len(data), max_points, large_mode)
+    if mode == 'density':
+        density(ax, data, x, y, hue, population=population)
+        return
+    if mode == 'sample':
+        strata = [data[y] < 0] if hue is None else [data[hue], data[y] < 0]
+        data = stratified_sample(data, strata, max_points)
+    sns.scatterplot(data=data, x=x, y=y, hue=hue, alpha=alpha, ax=ax)
+    label = sample_label(len(data), population)
+    if label is not None:
+        _note(ax, label)
+
+
+def density(ax, data, x, y, hue=None, bins=(60, 60), population=None):
+    """2D-гистограмма: цвет ячейки — преобладающая группа, прозрачность — log числа точек."""
+    groups = None if hue is None else data[hue]
+    counts, x_edges, y_edges, labels = density_grid(data[x], data[y], groups, bins)
+    total = counts.sum(axis=0)
+    colors = np.asarray(sns.color_palette(n_colors=len(labels)))
+
+    rgba = np.zeros((bins[1], bins[0], 4))
+    rgba[..., :3] = colors[counts.argmax(axis=0)].transpose(1, 0, 2)
+    # Даже одиночные точки остаются заметными, чтобы не терять редкие убытки
+    scale = np.log1p(max(total.max(), 1))
+    rgba[..., 3] = np.where(total > 0, 0.3 + 0.7 * np.log1p(total) / scale, 0.0).T
+
+    ax.imshow(
+        rgba, origin='lower', aspect='auto', interpolation='nearest',
+        extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]),
+    )
+    if hue is not None:
+        handles = [Patch(color=color, label=str(label)) for color, label in zip(colors, labels)]
+        ax.legend(handles=handles, title=hue)
+    rows = sample_label(len(data), population) or f"{len(data):,} строк"
+    _note(ax, f"{rows}, карта плотности")
+
+
+def _note(ax, text):
+    ax.text(0.99, 0.01, text, transform=ax.transAxes, ha='right', va='bottom', fontsize=8, color='dimgray')
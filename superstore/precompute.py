@@ -0,0 +1,253 @@
+"""Предрасчёт всех агрегатов дашборда без Streamlit.
+
+    python -m superstore.precompute [source] [--artifact-dir DIR]
+
+Результат — версия артефакта ARTIFACT_DIR/v<N>:
+    aggregates/      объединяемые агрегаты (куб, убытки, выборка для графиков)
+    tables/*.parquet готовые таблицы, которые показывают страницы
+    manifest.json    версия, источник, метрики и контрольные суммы файлов
+Файл CURRENT указывает на последнюю готовую версию и переключается атомарно.
+Ключи загруженных строк для инкрементального обновления общие для всех
+версий: ARTIFACT_DIR/keys.sqlite (см. superstore.keystore). Файлы, которые
+не изменились с предыдущей версии, не переписываются, а связываются с ней
+жёсткими ссылками вместе с контрольными суммами из её манифеста.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from .aggregates import Aggregates, SeenOrders, fold, parquet_bytes
+from .ingest import CHUNK_SIZE, ROOT, SNAPSHOT_VERSION, SOURCE, clean, iter_chunks, source_fingerprint
+from .keystore import KeyStore
+from .parallel import aggregate_partitions, write_partitions
+from .schema import first_lines
+
+ARTIFACT_DIR = ROOT / 'data' / 'artifacts'
+ARTIFACT_FORMAT = 7
+# Сколько версий оставлять на диске
+KEEP_VERSIONS = 2
+LOSS_TABLE_COLUMNS = ['Product Name', 'Sales', 'Profit', 'Discount']
+
+
+class Summary:
+    """Готовые к показу таблицы и скалярные метрики статичных разделов дашборда."""
+
+    def __init__(self, tables, metrics):
+        self.tables = tables
+        self.metrics = metrics
+
+    def __getitem__(self, name):
+        return self.tables[name]
+
+    @classmethod
+    def from_aggregates(cls, aggregates):
+        cube, losses = aggregates.cube, aggregates.losses
+        tables = {
+            'category_totals': cube.category_totals(),
+            'region_totals': cube.region_totals(),
+            'monthly_sales': cube.monthly_sales(),
+            'top_customers_by_orders': aggregates.ranking.top(10),
+            'loss_by_category': losses.by('Category'),
+            'loss_by_subcategory': losses.by('Sub-Category', n=10),
+            'loss_by_customer': losses.by('Customer Name', n=5),
+            'loss_by_region': losses.by('Region'),
+            'loss_top_rows': losses.top_rows[LOSS_TABLE_COLUMNS].reset_index(drop=True),
+            'discount_frequencies': aggregates.discount_frequencies(),
+            'discount_curves': aggregates.breakeven.curves('Category'),
+            'breakeven_by_category': aggregates.breakeven.break_even('Category'),
+            'breakeven_by_subcategory': aggregates.breakeven.break_even('Sub-Category'),
+        }
+        metrics = {
+            'rows': aggregates.rows,
+            'loss_count': losses.count,
+            'loss_avg_discount': losses.avg_discount,
+            'ranking': aggregates.ranking.error_bounds(),
+        }
+        return cls(tables, metrics)
+
+    def to_files(self):
+        files = {f"{name}.parquet": parquet_bytes(table) for name, table in self.tables.items()}
+        files['metrics.json'] = json.dumps(self.metrics, indent=2).encode()
+        return files
+
+    @classmethod
+    def load(cls, directory):
+        directory = Path(directory)
+        tables = {path.stem: pd.read_parquet(path) for path in sorted(directory.glob('*.parquet'))}
+        metrics = json.loads((directory / 'metrics.json').read_text())
+        return cls(tables, metrics)
+
+
+def current_version(artifact_dir=ARTIFACT_DIR):
+    marker = Path(artifact_dir) / 'CURRENT'
+    return marker.read_text().strip() if marker.exists() else None
+
+
+def require_version(artifact_dir=ARTIFACT_DIR):
+    """Текущая версия артефакта; FileNotFoundError, если артефакт ещё не посчитан."""
+    version = current_version(artifact_dir)
+    if version is None:
+        raise FileNotFoundError(
+            f"Нет артефакта в {artifact_dir}, сначала выполните python -m superstore.precompute"
+        )
+    return version
+
+
+def next_version(artifact_dir=ARTIFACT_DIR):
+    previous = current_version(artifact_dir)
+    return f"v{int(previous[1:]) + 1 if previous else 1:06d}"
+
+
+def open_keys(artifact_dir=ARTIFACT_DIR, base=None):
+    """Запись ключей следующей версии; base — версия, которую она продолжает."""
+    return KeyStore(Path(artifact_dir) / 'keys.sqlite', next_version(artifact_dir), base)
+
+
+def build(source=SOURCE, chunksize=CHUNK_SIZE, workers=1, keys=None, artifact_dir=ARTIFACT_DIR):
+    """Агрегаты по всей выгрузке, читаемой порциями; ключи строк пишутся в keys.
+
+    При workers > 1 выгрузка раскладывается по месячным партициям во
+    временном каталоге внутри artifact_dir и агрегируется в пуле процессов
+    (см. superstore.parallel); после расчёта партиции удаляются.
+    """
+    if workers > 1:
+        return _build_parallel(source, chunksize, workers, keys, artifact_dir)
+    seen = SeenOrders()
+
+    def parts():
+        for chunk in iter_chunks(source, chunksize):
+            chunk = clean(chunk)
+            first = seen.first_lines(chunk)
+            if keys is not None:
+                keys.record(chunk, first)
+            yield Aggregates.from_frame(chunk, first=first)
+
+    aggregates = fold(parts())
+    if aggregates is None:
+        raise ValueError(f"В выгрузке нет строк: {source}")
+    return aggregates
+
+
+def _build_parallel(source, chunksize, workers, keys, artifact_dir):
+    Path(artifact_dir).mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=artifact_dir, prefix='partitions-') as tmp:
+        directory = write_partitions(source, chunksize=chunksize, cache_dir=tmp)
+        aggregates = aggregate_partitions(directory, workers)
+        if keys is not None:
+            # Заказ мог попасть в несколько файлов партиции: повтор Order ID в orders безвреден
+            for part in sorted(directory.glob('*/*.parquet')):
+                part = pd.read_parquet(part)
+                keys.record(part, first_lines(part))
+    return aggregates
+
+
+def write_artifact(aggregates, keys, artifact_dir=ARTIFACT_DIR, origin=None):
+    """Пишет новую версию рядом с предыдущими и атомарно переключает CURRENT.
+
+    keys — KeyStore этой версии: ключи фиксируются до переключения CURRENT.
+    """
+    artifact_dir = Path(artifact_dir)
+    previous = current_version(artifact_dir)
+    version = next_version(artifact_dir)
+    directory = artifact_dir / version
+
+    summary = Summary.from_aggregates(aggregates)
+    files = {f"aggregates/{name}": data for name, data in aggregates.to_files().items()}
+    files.update({f"tables/{name}": data for name, data in summary.to_files().items()})
+    checksums, reused = _write_files(directory, files, artifact_dir, previous)
+
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'schema_version': SNAPSHOT_VERSION,
+        'version': version,
+        'previous': previous,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'origin': origin or {},
+        'metrics': summary.metrics,
+        'files': checksums,
+        'reused': reused,
+    }
+    (directory / 'manifest.json').write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+    keys.commit()
+
+    marker = artifact_dir / 'CURRENT'
+    tmp = marker.with_suffix('.tmp')
+    tmp.write_text(version)
+    os.replace(tmp, marker)
+
+    versions = sorted(p for p in artifact_dir.glob('v*') if p.is_dir())
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(old, ignore_errors=True)
+    keys.prune(versions[-KEEP_VERSIONS:][0].name)
+    return version
+
+
+def load_manifest(version, artifact_dir=ARTIFACT_DIR):
+    return json.loads((Path(artifact_dir) / version / 'manifest.json').read_text())
+
+
+def load_summary(version, artifact_dir=ARTIFACT_DIR):
+    return Summary.load(Path(artifact_dir) / version / 'tables')
+
+
+def load_aggregates(version, artifact_dir=ARTIFACT_DIR):
+    return Aggregates.load(Path(artifact_dir) / version / 'aggregates')
+
+
+def precompute(source=SOURCE, artifact_dir=ARTIFACT_DIR, chunksize=CHUNK_SIZE, workers=1):
+    Path(artifact_dir).mkdir(parents=True, exist_ok=True)
+    keys = open_keys(artifact_dir)
+    try:
+        aggregates = build(source, chunksize, workers, keys, artifact_dir)
+        origin = {'source': str(source), 'fingerprint': source_fingerprint(source)}
+        return write_artifact(aggregates, keys, artifact_dir, origin)
+    finally:
+        keys.close()
+
+
+def _write_files(directory, files, artifact_dir, previous):
+    """Пишет файлы версии и возвращает их контрольные суммы и список неизменившихся.
+
+    Файл с той же суммой, что в манифесте предыдущей версии, не пишется
+    заново, а связывается с её файлом жёсткой ссылкой.
+    """
+    known = load_manifest(previous, artifact_dir).get('files', {}) if previous else {}
+    checksums, reused = {}, []
+    for name, data in sorted(files.items()):
+        path = directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256(data).hexdigest()
+        checksums[name] = {'bytes': len(data), 'sha256': digest}
+        if known.get(name, {}).get('sha256') == digest:
+            try:
+                os.link(Path(artifact_dir) / previous / name, path)
+                reused.append(name)
+                continue
+            except OSError:
+                pass
+        path.write_bytes(data)
+    return checksums, reused
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Предрасчёт агрегатов дашборда")
+    parser.add_argument('source', nargs='?', type=Path, default=SOURCE)
+    parser.add_argument('--artifact-dir', type=Path, default=ARTIFACT_DIR)
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=1, help="процессов для агрегации по месяцам")
+    args = parser.parse_args(argv)
+
+    version = precompute(args.source, args.artifact_dir, args.chunksize, args.workers)
+    metrics = load_manifest(version, args.artifact_dir)['metrics']
+    print(f"Готово: {metrics['rows']} строк -> {args.artifact_dir / version}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Рейтинг клиентов по числу уникальных заказов: точный и потоковый.
+
+Заказы клиента считаются по первым строкам заказов (признак first, см.
+superstore.aggregates), поэтому счётчики частей просто складываются.
+Точный режим хранит счётчик каждого клиента. Потоковый держит не больше
+CAPACITY счётчиков Мисры–Гриса (эквивалент SpaceSaving, объединяемый через
+merge_all): счётчик кандидата не больше истинного числа заказов и меньше
+его не больше чем на сумму срезанных порогов. Сами счётчики занимают
+O(CAPACITY) при любом числе клиентов. Признак first при этом требует
+помнить уже встреченные заказы (SeenOrders или keys.sqlite, около 8 байт
+на заказ), так что потоковая загрузка в целом — O(CAPACITY + число заказов).
+
+Оба варианта объединяются через merge_all по партициям и порциям обновления,
+а top(n) возвращает клиентов с оценкой и гарантированным диапазоном числа заказов.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from .schema import first_lines
+
+# 'exact' — точный подсчёт; 'streaming' — счётчики с ограниченной памятью
+RANKING_MODE = os.environ.get('SUPERSTORE_RANKING', 'exact')
+# Кандидатов в тяжёлые клиенты в потоковом режиме
+CAPACITY = 2_000
+
+
+def ranking_from_frame(df, first, mode=None):
+    mode = mode or RANKING_MODE
+    if mode == 'exact':
+        return ExactRanking.from_frame(df, first)
+    if mode == 'streaming':
+        return StreamingRanking.from_frame(df, first)
+    raise ValueError(f"Неизвестный режим рейтинга клиентов: {mode!r}")
+
+
+def load_ranking(frames, meta):
+    cls = {'exact': ExactRanking, 'streaming': StreamingRanking}[meta['mode']]
+    return cls.from_frames(frames, meta)
+
+
+def _order_counts(df, first):
+    """Число заказов каждого клиента по первым строкам заказов; индекс — имя клиента."""
+    if first is None:
+        first = first_lines(df)
+    customers = df.loc[np.asarray(first, dtype=bool), 'Customer Name'].dropna().astype(str)
+    return customers.groupby(customers.to_numpy()).size().rename(None).rename_axis('Customer Name')
+
+
+class ExactRanking:
+    """Число заказов каждого клиента."""
+
+    mode = 'exact'
+
+    def __init__(self, counts):
+        self.counts = counts
+
+    @classmethod
+    def from_frame(cls, df, first=None):
+        return cls(_order_counts(df, first))
+
+    @classmethod
+    def merge_all(cls, rankings):
+        counts = pd.concat([ranking.counts for ranking in rankings])
+        return cls(counts.groupby(level=0, sort=True).sum())
+
+    def top(self, n=10):
+        """Клиенты с наибольшим числом заказов; границы совпадают с оценкой."""
+        counts = self.counts.nlargest(n, keep='first')
+        return pd.DataFrame({
+            'Customer Name': counts.index,
+            'orders': counts.to_numpy(),
+            'lower': counts.to_numpy(),
+            'upper': counts.to_numpy(),
+        })
+
+    def error_bounds(self):
+        return {'mode': self.mode, 'missed_orders': 0}
+
+    def to_frames(self):
+        return {'ranking_counts': self.counts.rename('orders').reset_index()}, {'mode': self.mode}
+
+    @classmethod
+    def from_frames(cls, frames, meta):
+        return cls(frames['ranking_counts'].set_index('Customer Name')['orders'].rename(None))
+
+
+class StreamingRanking:
+    """Счётчики Мисры–Гриса заказов клиентов.
+
+    weights — сумма заказов клиента по порциям минус всё, что срезано
+    при сжатии; reduction — сумма срезанных порогов. Поэтому у кандидата
+    weight ≤ заказов ≤ weight + reduction, а клиент, у которого заказов
+    больше reduction, гарантированно остаётся кандидатом.
+    """
+
+    mode = 'streaming'
+
+    def __init__(self, weights, reduction=0, capacity=CAPACITY):
+        self.weights = weights
+        self.reduction = reduction
+        self.capacity = capacity
+
+    @classmethod
+    def from_frame(cls, df, first=None, capacity=CAPACITY):
+        # Порция и так в памяти: счётчики сжимаются только при слиянии,
+        # чтобы каждая порция не добавляла свой порог к reduction
+        return cls(_order_counts(df, first), 0, capacity)
+
+    @classmethod
+    def merge_all(cls, rankings):
+        """Сумма счётчиков всех сводок, затем одно сжатие до capacity."""
+        weights = pd.concat([ranking.weights for ranking in rankings])
+        weights = weights.groupby(level=0, sort=True).sum()
+        capacity = max(ranking.capacity for ranking in rankings)
+        compressed, threshold = _compress(weights, capacity)
+        reduction = sum(ranking.reduction for ranking in rankings) + threshold
+        return cls(compressed, reduction, capacity)
+
+    def top(self, n=10):
+        """Кандидаты с наибольшим счётчиком и гарантированным диапазоном заказов.
+
+        orders — верхняя граница weight + reduction, как у SpaceSaving.
+        Она точна, только если каждый порог, вошедший в reduction, был
+        вычтен из счётчика клиента, то есть клиент был в каждой сжатой
+        сводке. Клиент, впервые встреченный после сжатия, эти пороги не
+        терял, и его граница завышена на их сумму, но не больше чем на
+        reduction. При reduction = 0 обе границы точны.
+        """
+        weights = self.weights.sort_index().nlargest(n, keep='first')
+        upper = weights.to_numpy() + int(self.reduction)
+        return pd.DataFrame({
+            'Customer Name': weights.index,
+            'orders': upper,
+            'lower': weights.to_numpy(),
+            'upper': upper,
+        })
+
+    def error_bounds(self):
+        return {'mode': self.mode, 'missed_orders': int(self.reduction)}
+
+    def to_frames(self):
+        frames = {'ranking_weights': self.weights.rename('weight').reset_index()}
+        meta = {'mode': self.mode, 'reduction': int(self.reduction), 'capacity': self.capacity}
+        return frames, meta
+
+    @classmethod
+    def from_frames(cls, frames, meta):
+        weights = frames['ranking_weights'].set_index('Customer Name')['weight'].rename(None)
+        return cls(weights, meta['reduction'], meta['capacity'])
+
+
+def _compress(counts, capacity):
+    """Оставляет не больше capacity счётчиков: вычитает (capacity+1)-е значение и отбрасывает неположительные."""
+    if len(counts) <= capacity:
+        return counts, 0
+    threshold = int(counts.nlargest(capacity + 1, keep='all').iloc[capacity])
+    counts = counts - threshold
+    return counts[counts > 0], threshold
+
+
+def compress_groups(counts, levels, capacity):
+    """_compress отдельно в каждой группе по уровням levels.
+
+    Возвращает сжатые счётчики и срезанный порог каждой группы (0, если
+    группа и так не больше capacity).
+    """
+    ordered = counts.sort_values(ascending=False, kind='stable')
+    position = ordered.groupby(level=levels, observed=True).cumcount()
+    others = [name for name in counts.index.names if name not in levels]
+    thresholds = ordered[position.to_numpy() == capacity].droplevel(others)
+    if thresholds.empty:
+        return counts, thresholds
+    cut = thresholds.reindex(counts.index.droplevel(others), fill_value=0).to_numpy()
+    counts = counts - cut
+    return counts[counts > 0], thresholds
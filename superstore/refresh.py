@@ -0,0 +1,80 @@
+"""Инкрементальное обновление артефакта агрегатов файлами с новыми заказами.
+
+    python -m superstore.refresh <delta.xlsx|.csv|.parquet>
+
+Берётся текущая версия артефакта (см. superstore.precompute), новые строки
+сворачиваются в её агрегаты и записываются следующей версией. Транзакции
+истории при этом не перечитываются: уже загруженные строки и заказы ищутся
+по индексу в keys.sqlite (см. superstore.keystore).
+"""
+import argparse
+from pathlib import Path
+
+from .aggregates import Aggregates, fold
+from .ingest import CHUNK_SIZE, clean, iter_chunks
+from .precompute import ARTIFACT_DIR, ARTIFACT_FORMAT, current_version, load_aggregates, load_manifest, open_keys, require_version, write_artifact
+
+
+def load_state(artifact_dir=ARTIFACT_DIR):
+    """Текущая версия артефакта и её агрегаты."""
+    version = require_version(artifact_dir)
+    found = load_manifest(version, artifact_dir)['format']
+    if found != ARTIFACT_FORMAT:
+        raise ValueError(
+            f"Артефакт {version} в формате {found}, а обновление ждёт {ARTIFACT_FORMAT}: "
+            "пересчитайте его через python -m superstore.precompute"
+        )
+    return version, load_aggregates(version, artifact_dir)
+
+
+def append_delta(delta, artifact_dir=ARTIFACT_DIR, chunksize=CHUNK_SIZE):
+    """Добавляет новые строки из файла delta; возвращает (агрегаты, добавлено строк, пропущено строк).
+
+    Пропускаются строки, уже загруженные в историю (с учётом кратности,
+    см. superstore.keystore). Новая строка уже известного заказа
+    добавляется, но сам заказ второй раз не считается. Рейтинг клиентов
+    считается в режиме артефакта, а не текущего SUPERSTORE_RANKING.
+    """
+    version, history = load_state(artifact_dir)
+    keys = open_keys(artifact_dir, base=version)
+    counts = {'added': 0, 'skipped': 0}
+
+    def parts():
+        for chunk in iter_chunks(delta, chunksize):
+            chunk = clean(chunk.reset_index(drop=True))
+            fresh = keys.new_lines(chunk)
+            counts['skipped'] += int((~fresh).sum())
+            chunk = chunk[fresh].reset_index(drop=True)
+            if chunk.empty:
+                continue
+            first = keys.first_lines(chunk)
+            keys.record(chunk, first)
+            counts['added'] += len(chunk)
+            yield Aggregates.from_frame(chunk, first=first, ranking_mode=history.ranking.mode)
+
+    try:
+        update = fold(parts())
+        aggregates = history if update is None else Aggregates.merge_all([history, update])
+        if counts['added']:
+            origin = {'delta': str(delta), 'added_rows': counts['added'], 'skipped_rows': counts['skipped']}
+            write_artifact(aggregates, keys, artifact_dir, origin)
+    finally:
+        keys.close()
+    return aggregates, counts['added'], counts['skipped']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Инкрементальное обновление агрегатов дашборда")
+    parser.add_argument('delta', type=Path, help="файл с новыми заказами")
+    parser.add_argument('--artifact-dir', type=Path, default=ARTIFACT_DIR)
+    args = parser.parse_args(argv)
+
+    aggregates, added, skipped = append_delta(args.delta, args.artifact_dir)
+    print(
+        f"Добавлено строк: {added}, пропущено уже загруженных: {skipped}, "
+        f"всего {aggregates.rows}, версия {current_version(args.artifact_dir)}"
+    )
+
+
+if __name__ == '__main__':
+    main()
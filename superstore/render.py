@@ -0,0 +1,119 @@
+"""Рендер графиков matplotlib в PNG и ограниченный LRU-кэш готовых графиков."""
+import functools
+import io
+import json
+import threading
+from collections import OrderedDict
+
+from . import instrument
+
+# Те же параметры сохранения, что использует st.pyplot
+SAVEFIG_KWARGS = {'format': 'png', 'bbox_inches': 'tight', 'dpi': 200}
+
+
+@functools.cache
+def _pyplot():
+    """Импортирует pyplot при первом рендере и задаёт стиль графиков."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set(style="whitegrid")
+    plt.style.use("ggplot")
+    return plt
+
+
+def render_png(draw, figsize=None):
+    """Рисует график функцией draw(ax) и возвращает PNG; фигура всегда закрывается."""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=figsize)
+    try:
+        draw(ax)
+        buf = io.BytesIO()
+        fig.savefig(buf, **SAVEFIG_KWARGS)
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def spec_nbytes(entry):
+    """Размер пары (данные, спецификация): память таблицы и длина спецификации в JSON."""
+    data, spec = entry
+    return int(data.memory_usage(deep=True).sum()) + len(json.dumps(spec, default=str))
+
+
+class ChartCache:
+    """LRU-кэш готовых графиков с ограничением по числу записей и по байтам.
+
+    Ключ графика — (id графика, значения фильтров, отпечаток данных).
+    Записи — PNG, а с sizeof=spec_nbytes — пары (данные, Vega-Lite-спецификация).
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            # Запись больше всего бюджета не кэшируем вовсе
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def render(self, key, draw, figsize=None):
+        with instrument.span('render', str(key[0])) as record:
+            png = self.get(key)
+            record['cache_hit'] = png is not None
+            if png is None:
+                png = render_png(draw, figsize)
+                self.put(key, png)
+            record['bytes'] = len(png)
+        return png
+
+    def spec(self, key, build):
+        """Данные и спецификация build() для графика в браузере; строятся один раз на ключ."""
+        with instrument.span('render', str(key[0])) as record:
+            entry = self.get(key)
+            record['cache_hit'] = entry is not None
+            if entry is None:
+                entry = build()
+                self.put(key, entry)
+            record['rows'] = len(entry[0])
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self.nbytes,
+            }
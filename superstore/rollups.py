@@ -0,0 +1,142 @@
+"""Многоуровневые временные ряды: день, неделя, месяц и квартал.
+
+Продажи, прибыль, строки и заказы копятся по дням (целые коды дней с 1970
+года) в разрезе региона. Заказ считается по своей первой строке (признак
+first, см. superstore.aggregates), поэтому дневные счётчики заказов
+складываются через merge_all так же точно, как суммы. Из них один раз строятся плотные таблицы по всем
+разрешениям, поэтому запрос любого диапазона — срез по позициям длиной
+не больше числа точек графика, без обращения к транзакциям.
+"""
+import numpy as np
+import pandas as pd
+
+from . import instrument
+
+RESOLUTIONS = ('day', 'week', 'month', 'quarter')
+MEASURES = ['Sales', 'Profit', 'rows', 'orders']
+# Сколько точек помещается на графике ряда
+TARGET_POINTS = 120
+
+
+def period_codes(days, resolution):
+    """Целые коды периодов по кодам дней (дни с 1970-01-01)."""
+    days = np.asarray(days, dtype='int64')
+    if resolution == 'day':
+        return days
+    if resolution == 'week':
+        # 1970-01-01 — четверг, сдвиг на 3 дня начинает недели с понедельника
+        return (days + 3) // 7
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype('int64')
+    if resolution == 'month':
+        return months
+    if resolution == 'quarter':
+        return months // 3
+    raise ValueError(f"Неизвестное разрешение: {resolution!r}")
+
+
+def period_starts(codes, resolution):
+    """Даты начала периодов по их кодам."""
+    codes = np.asarray(codes, dtype='int64')
+    if resolution == 'day':
+        starts = codes.astype('datetime64[D]')
+    elif resolution == 'week':
+        starts = (codes * 7 - 3).astype('datetime64[D]')
+    elif resolution == 'month':
+        starts = codes.astype('datetime64[M]')
+    elif resolution == 'quarter':
+        starts = (codes * 3).astype('datetime64[M]')
+    else:
+        raise ValueError(f"Неизвестное разрешение: {resolution!r}")
+    return pd.DatetimeIndex(starts.astype('datetime64[s]'))
+
+
+def day_code(date):
+    return int(np.datetime64(pd.Timestamp(date).date(), 'D').astype('int64'))
+
+
+def choose_resolution(start, end, target=TARGET_POINTS):
+    """Самое подробное разрешение, при котором в диапазоне не больше target точек."""
+    first, last = day_code(start), day_code(end)
+    for resolution in RESOLUTIONS:
+        codes = period_codes([first, last], resolution)
+        if codes[1] - codes[0] + 1 <= target:
+            return resolution
+    return RESOLUTIONS[-1]
+
+
+class Rollups:
+    """Дневные суммы по регионам и построенные из них плотные ряды всех разрешений.
+
+    orders — число первых строк заказов: у заказа одна дата и один регион,
+    так что это число уникальных заказов дня при любом разбиении на порции.
+    """
+
+    def __init__(self, days):
+        self.days = days
+        self._dense = {}
+
+    @classmethod
+    def from_frame(cls, df, first):
+        with instrument.span('aggregate', 'rollups.build', rows=len(df)):
+            return cls._from_frame(df, first)
+
+    @classmethod
+    def _from_frame(cls, df, first):
+        day = df['Order Date'].to_numpy().astype('datetime64[D]').astype('int64')
+        days = (
+            df.assign(day=day, first=np.asarray(first, dtype='int64'))
+            .groupby(['Region', 'day'], observed=True)
+            .agg(Sales=('Sales', 'sum'), Profit=('Profit', 'sum'),
+                 rows=('Sales', 'size'), orders=('first', 'sum'))
+            .sort_index()
+        )
+        return cls(days)
+
+    @classmethod
+    def merge_all(cls, rollups):
+        days = pd.concat([part.days for part in rollups])
+        return cls(days.groupby(level=days.index.names, observed=True).sum().sort_index())
+
+    @property
+    def bounds(self):
+        """Первый и последний день с заказами."""
+        day = self.days.index.get_level_values('day')
+        return period_starts([day.min()], 'day')[0], period_starts([day.max()], 'day')[0]
+
+    def dense(self, resolution, region=None):
+        """Плотная таблица разрешения resolution: строка на каждый период от первого до последнего."""
+        key = (resolution, region)
+        table = self._dense.get(key)
+        if table is None:
+            days = self.days if region is None else _region(self.days, region)
+            codes = period_codes(days.index.get_level_values('day'), resolution)
+            table = days.groupby(codes).sum()
+            all_days = self.days.index.get_level_values('day')
+            first, last = period_codes([all_days.min(), all_days.max()], resolution)
+            table = table.reindex(np.arange(first, last + 1), fill_value=0)
+            table.index.name = 'code'
+            self._dense[key] = table
+        return table
+
+    def series(self, start, end, region=None, resolution=None, target=TARGET_POINTS):
+        """Ряд за [start, end]: (разрешение, таблица с колонкой period и MEASURES).
+
+        Крайние периоды берутся целиком: диапазон расширяется до их границ.
+        """
+        resolution = resolution or choose_resolution(start, end, target)
+        with instrument.span('aggregate', 'rollups.series') as record:
+            table = self.dense(resolution, region)
+            lo, hi = period_codes([day_code(start), day_code(end)], resolution)
+            offset = table.index[0]
+            rows = table.iloc[max(lo - offset, 0):max(hi - offset + 1, 0)]
+            result = rows.reset_index(drop=True)
+            result.insert(0, 'period', period_starts(rows.index, resolution))
+            record['rows'] = len(result)
+        return resolution, result
+
+
+def _region(days, region):
+    try:
+        return days.xs(region, level='Region', drop_level=False)
+    except KeyError:
+        return days.iloc[:0]
@@ -0,0 +1,76 @@
+"""Подготовка больших диаграмм рассеяния: стратифицированная выборка и 2D-бининг."""
+import os
+
+import numpy as np
+import pandas as pd
+
+# Выше этого числа строк диаграмма переключается в режим для больших данных;
+# столько же строк хранит выборка агрегатов (см. superstore.aggregates)
+MAX_POINTS = int(os.environ.get('SUPERSTORE_MAX_POINTS', 20_000))
+# 'density' — 2D-гистограмма по категориям, 'sample' — стратифицированная выборка
+LARGE_DATA_MODE = os.environ.get('SUPERSTORE_LARGE_DATA', 'density')
+
+
+def choose_mode(n_rows, max_points=MAX_POINTS, large_mode=LARGE_DATA_MODE):
+    return 'points' if n_rows <= max_points else large_mode
+
+
+def sample_label(shown, population=None):
+    """Подпись «выборка N из M строк», если на графике не все population строк, иначе None."""
+    if population is None or population <= shown:
+        return None
+    return f"выборка {shown:,} из {population:,} строк"
+
+
+def stratified_sample(df, strata, n, min_per_stratum=50, seed=0):
+    """Выборка примерно из n строк с долями страт как в исходных данных.
+
+    Каждая страта получает не меньше min_per_stratum строк, поэтому редкие
+    группы (например, убыточные заказы) не пропадают с графика.
+    """
+    if len(df) <= n:
+        return df
+    keys = df.groupby(strata, observed=True, sort=False).ngroup().to_numpy()
+    sizes = np.bincount(keys)
+    quota = np.minimum(sizes, np.maximum(np.round(sizes * n / len(df)), min_per_stratum))
+
+    order = np.random.default_rng(seed).permutation(len(df))
+    shuffled = keys[order]
+    rank = pd.Series(shuffled).groupby(shuffled).cumcount().to_numpy()
+    keep = np.sort(order[rank < quota[shuffled]])
+    return df.iloc[keep]
+
+
+def density_grid(x, y, groups=None, bins=(50, 50)):
+    """Число точек в ячейках 2D-сетки для каждой группы.
+
+    Возвращает (counts[group, ix, iy], x_edges, y_edges, labels). Диапазон по y
+    всегда включает ноль, чтобы граница прибыли и убытков была на графике.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    if groups is None:
+        codes, labels = np.zeros(len(x), dtype='int64'), [None]
+    else:
+        codes, labels = pd.factorize(groups, sort=True)
+        labels = list(labels)
+    valid = np.isfinite(x) & np.isfinite(y) & (codes >= 0)
+    x, y, codes = x[valid], y[valid], codes[valid]
+
+    x_edges = _edges(x, bins[0])
+    y_edges = _edges(np.append(y, 0.0), bins[1])
+    ix = np.clip(np.searchsorted(x_edges, x, side='right') - 1, 0, bins[0] - 1)
+    iy = np.clip(np.searchsorted(y_edges, y, side='right') - 1, 0, bins[1] - 1)
+
+    flat = (codes * bins[0] + ix) * bins[1] + iy
+    counts = np.bincount(flat, minlength=len(labels) * bins[0] * bins[1])
+    return counts.reshape(len(labels), bins[0], bins[1]), x_edges, y_edges, labels
+
+
+def _edges(values, n_bins):
+    if not len(values):
+        return np.linspace(0.0, 1.0, n_bins + 1)
+    lo, hi = float(np.nanmin(values)), float(np.nanmax(values))
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, n_bins + 1)
@@ -0,0 +1,87 @@
+"""Декларативная схема очищенной таблицы транзакций."""
+import numpy as np
+import pandas as pd
+
+# Строковые колонки с небольшим числом уникальных значений храним как категории
+CATEGORICAL = (
+    'Category', 'Sub-Category', 'Region', 'Segment', 'Ship Mode', 'Country',
+    'State', 'City', 'Manufacturer', 'Customer Name', 'Product Name', 'Order ID',
+)
+# Из них словари, которые растут вместе с данными: клиенты, товары, заказы
+IDENTIFIERS = ('Customer Name', 'Product Name', 'Order ID')
+NUMERIC = {
+    'Discount': 'float32',
+    'Profit Ratio': 'float32',
+    'Quantity': 'int16',
+    'Postal Code': 'int32',
+    'Number of Records': 'int8',
+}
+# Денежные колонки приходят строками вида "$1,234" / "-$65"
+MONEY = ('Sales', 'Profit')
+DATES = ('Order Date', 'Ship Date')
+
+
+def parse_money(values):
+    """Переводит денежные строки в float64 без регулярного выражения на каждую ячейку.
+
+    Разбираются только уникальные значения, результат раскладывается по кодам.
+    """
+    values = pd.Series(values, copy=False)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype('float64')
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_numeric(
+        pd.Index(uniques, dtype=object).astype(str)
+        .str.replace('$', '', regex=False)
+        .str.replace(',', '', regex=False)
+    ).to_numpy('float64')
+    out = parsed.take(codes) if len(parsed) else np.full(len(codes), np.nan)
+    out[codes < 0] = np.nan
+    return pd.Series(out, index=values.index, name=values.name)
+
+
+def apply_schema(df):
+    """Приводит колонки к компактным типам и добавляет производные признаки."""
+    for col in MONEY:
+        df[col] = parse_money(df[col])
+    for col in DATES:
+        if col in df:
+            df[col] = pd.to_datetime(df[col])
+    for col, dtype in NUMERIC.items():
+        if col in df:
+            df[col] = df[col].astype(dtype)
+    for col in CATEGORICAL:
+        if col in df:
+            df[col] = df[col].astype('category')
+    return add_derived(df)
+
+
+def add_derived(df):
+    """Год, месяц и признак убытка считаются один раз при загрузке."""
+    df['Year'] = df['Order Date'].dt.year.astype('int16')
+    df['Month'] = df['Order Date'].dt.to_period('M')
+    df['is_loss'] = df['Profit'] < 0
+    return df
+
+
+def first_lines(df):
+    """Признак первой строки каждого заказа внутри таблицы."""
+    return ~df['Order ID'].duplicated().to_numpy()
+
+
+def drop_unused_categories(df, columns=None):
+    """Оставляет в словарях категорий columns (по умолчанию всех) только встречающиеся значения.
+
+    Срез таблицы (take, loc) наследует словари целиком; без этого каждая
+    маленькая часть носит, пиклит и при склейке заново сверяет словари
+    всех клиентов и товаров.
+    """
+    columns = [
+        col for col in (df.columns if columns is None else columns)
+        if col in df and isinstance(df[col].dtype, pd.CategoricalDtype)
+    ]
+    return df.assign(**{col: df[col].cat.remove_unused_categories() for col in columns})
+
+
+def bytes_per_row(df):
+    return df.memory_usage(deep=True).sum() / max(len(df), 1)
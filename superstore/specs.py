@@ -0,0 +1,132 @@
+"""Декларативные Vega-Lite-графики, которые рисуются в браузере.
+
+Каждая функция возвращает (data, spec): небольшую таблицу агрегатов
+и спецификацию без данных. Сервер ничего не растрирует, а размер ответа
+ограничен размером агрегатов, а не картинки; наведение и масштаб работают
+без перезапуска скрипта. Набор графиков повторяет superstore.plots.
+"""
+import numpy as np
+import pandas as pd
+
+from .scatter import density_grid, sample_label
+
+# Сетка агрегированной диаграммы скидка–прибыль
+SCATTER_BINS = (40, 40)
+
+
+def category_bars(data, column, scheme, xlabel):
+    spec = {
+        'mark': {'type': 'bar', 'tooltip': True},
+        'encoding': {
+            'y': {'field': 'Category', 'type': 'nominal', 'title': "Категория"},
+            'x': {'field': column, 'type': 'quantitative', 'title': xlabel},
+            'color': {'field': 'Category', 'type': 'nominal', 'scale': {'scheme': scheme}, 'legend': None},
+        },
+    }
+    return data, spec
+
+
+def monthly_line(data):
+    spec = {
+        'mark': {'type': 'line', 'point': True, 'tooltip': True},
+        'encoding': {
+            'x': {'field': 'Month', 'type': 'temporal', 'timeUnit': 'yearmonth', 'title': "Месяц"},
+            'y': {'field': 'Sales', 'type': 'quantitative', 'title': "Продажи"},
+        },
+        'params': [{'name': 'zoom', 'select': {'type': 'interval', 'encodings': ['x']}, 'bind': 'scales'}],
+    }
+    return data, spec
+
+
+def period_line(data, column, ylabel):
+    spec = {
+        'mark': {'type': 'line', 'point': len(data) <= 60, 'tooltip': True},
+        'encoding': {
+            'x': {'field': 'period', 'type': 'temporal', 'title': "Период"},
+            'y': {'field': column, 'type': 'quantitative', 'title': ylabel},
+        },
+        'params': [{'name': 'zoom', 'select': {'type': 'interval', 'encodings': ['x']}, 'bind': 'scales'}],
+    }
+    return data[['period', column]], spec
+
+
+def loss_probability_lines(curves, level='Category'):
+    data = curves[[level, 'discount_from', 'rows', 'loss_probability', 'mean_profit', 'ratio_q50']]
+    spec = {
+        'layer': [
+            {
+                'mark': {'type': 'line', 'point': True, 'tooltip': True},
+                'encoding': {
+                    'x': {'field': 'discount_from', 'type': 'quantitative', 'title': "Скидка (%)", 'axis': {'format': '%'}},
+                    'y': {'field': 'loss_probability', 'type': 'quantitative', 'title': "Вероятность убытка",
+                          'scale': {'domain': [0, 1]}},
+                    'color': {'field': level, 'type': 'nominal'},
+                },
+            },
+            {
+                'mark': {'type': 'rule', 'color': 'red', 'strokeDash': [4, 4]},
+                'encoding': {'y': {'datum': 0.5}},
+            },
+        ],
+    }
+    return data, spec
+
+
+def customers_barh(counts, xlabel):
+    data = counts.rename_axis('Customer Name').rename('count').reset_index()
+    data['Customer Name'] = data['Customer Name'].astype(str)
+    spec = {
+        'mark': {'type': 'bar', 'color': 'skyblue', 'tooltip': True},
+        'encoding': {
+            'y': {'field': 'Customer Name', 'type': 'nominal', 'sort': '-x', 'title': "Клиент"},
+            'x': {'field': 'count', 'type': 'quantitative', 'title': xlabel},
+        },
+    }
+    return data, spec
+
+
+def discount_profit_bins(rows, hue='Category', bins=SCATTER_BINS, population=None):
+    """Скидка vs прибыль как сетка ячеек: на клиент уходят только непустые ячейки.
+
+    Цвет ячейки — преобладающая группа, прозрачность — log числа строк,
+    как у карты плотности в superstore.plots. Если rows — выборка из
+    population строк, это подписано под графиком.
+    """
+    counts, x_edges, y_edges, labels = density_grid(rows['Discount'], rows['Profit'], rows[hue], bins)
+    total = counts.sum(axis=0)
+    ix, iy = np.nonzero(total)
+    data = pd.DataFrame({
+        'discount_from': x_edges[ix],
+        'discount_to': x_edges[ix + 1],
+        'profit_from': y_edges[iy],
+        'profit_to': y_edges[iy + 1],
+        hue: np.asarray(labels, dtype=object)[counts[:, ix, iy].argmax(axis=0)].astype(str),
+        'rows': total[ix, iy],
+    })
+    data['weight'] = np.log1p(data['rows']) / np.log1p(max(int(total.max()), 1))
+    spec = {
+        'layer': [
+            {
+                'mark': {'type': 'rect', 'tooltip': True},
+                'encoding': {
+                    'x': {'field': 'discount_from', 'type': 'quantitative', 'title': "Скидка (%)"},
+                    'x2': {'field': 'discount_to'},
+                    'y': {'field': 'profit_from', 'type': 'quantitative', 'title': "Прибыль"},
+                    'y2': {'field': 'profit_to'},
+                    'color': {'field': hue, 'type': 'nominal'},
+                    'opacity': {'field': 'weight', 'type': 'quantitative', 'scale': {'range': [0.3, 1]}, 'legend': None},
+                },
+                'params': [{'name': 'zoom', 'select': 'interval', 'bind': 'scales'}],
+            },
+            {
+                'mark': {'type': 'rule', 'color': 'red', 'strokeDash': [4, 4]},
+                'encoding': {'y': {'datum': 0}},
+            },
+        ],
+    }
+    label = sample_label(len(rows), population)
+    if label is not None:
+        spec['title'] = {
+            'text': label, 'orient': 'bottom', 'anchor': 'end', 'fontSize': 10, 'fontWeight': 'normal', 'color': 'dimgray',
+        }
+    return data, spec
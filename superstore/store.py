@@ -0,0 +1,228 @@
+"""Локальная SQLite-база транзакций для фильтров страницы «Графики».
+
+Очищенные строки один раз складываются в файл базы с индексами по региону,
+дате заказа и категории, рядом — таблица daily с дневными суммами по регионам.
+Фильтры и группировки выполняются в SQL, в Python приходят только небольшие
+результаты, поэтому история может не помещаться в память. Методы повторяют
+интерфейс Cube и Rollups, которыми пользуется страница.
+"""
+import functools
+import os
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+from .ingest import CACHE_DIR, CHUNK_SIZE, SNAPSHOT_VERSION, SOURCE, clean, iter_chunks, source_fingerprint
+from .rollups import MEASURES as ROLLUP_MEASURES, TARGET_POINTS, choose_resolution, day_code, period_codes, period_starts
+
+# Увеличивать при изменении таблиц или индексов базы
+STORE_FORMAT = 2
+
+# Колонка таблицы -> колонка базы
+STORE_COLUMNS = {
+    'Order Date': 'order_date',
+    'Region': 'region',
+    'Category': 'category',
+    'Sub-Category': 'sub_category',
+    'Customer Name': 'customer',
+    'Order ID': 'order_id',
+    'Product Name': 'product',
+    'Sales': 'sales',
+    'Profit': 'profit',
+    'Discount': 'discount',
+    'Profit Ratio': 'profit_ratio',
+    'is_loss': 'is_loss',
+}
+INDEXES = {
+    'idx_region_date': ('region', 'order_date'),
+    'idx_date': ('order_date',),
+    'idx_category': ('category', 'order_date'),
+}
+# Заказ — одна дата и один регион, поэтому уникальные заказы дня складываются в уникальные заказы периода
+DAILY_SQL = """
+CREATE TABLE daily AS
+SELECT region, order_date, SUM(sales) AS sales, SUM(profit) AS profit,
+       COUNT(*) AS rows, COUNT(DISTINCT order_id) AS orders
+FROM transactions GROUP BY region, order_date
+"""
+
+
+def store_path(path=SOURCE, cache_dir=CACHE_DIR):
+    path = Path(path)
+    return Path(cache_dir) / f"{path.stem}-v{SNAPSHOT_VERSION}-s{STORE_FORMAT}-{source_fingerprint(path)}.sqlite"
+
+
+def write_store(frames, target):
+    """Записывает очищенные порции в новую базу target и строит индексы."""
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix('.tmp')
+    tmp.unlink(missing_ok=True)
+
+    with instrument.span('load', 'write_store') as record:
+        con = sqlite3.connect(tmp)
+        try:
+            # Файл пишется целиком и подменяется атомарно, журнал не нужен
+            con.execute('PRAGMA journal_mode = OFF')
+            con.execute('PRAGMA synchronous = OFF')
+            rows = 0
+            for df in frames:
+                table = df[list(STORE_COLUMNS)].rename(columns=STORE_COLUMNS)
+                table['order_date'] = table['order_date'].dt.strftime('%Y-%m-%d')
+                table.to_sql('transactions', con, if_exists='append', index=False, chunksize=CHUNK_SIZE)
+                rows += len(table)
+            for name, columns in INDEXES.items():
+                con.execute(f"CREATE INDEX {name} ON transactions ({', '.join(columns)})")
+            con.execute(DAILY_SQL)
+            con.execute('CREATE INDEX idx_daily ON daily (region, order_date)')
+            con.execute('ANALYZE')
+            con.commit()
+        finally:
+            con.close()
+        record['rows'] = rows
+    os.replace(tmp, target)
+    return target
+
+
+def build_store(path=SOURCE, cache_dir=CACHE_DIR, chunksize=CHUNK_SIZE):
+    """Строит базу по выгрузке, читаемой порциями, и удаляет устаревшие базы."""
+    path = Path(path)
+    target = write_store((clean(chunk) for chunk in iter_chunks(path, chunksize)), store_path(path, cache_dir))
+    for stale in target.parent.glob(f"{path.stem}-*.sqlite"):
+        if stale != target:
+            stale.unlink(missing_ok=True)
+    return target
+
+
+def open_store(path=SOURCE, cache_dir=CACHE_DIR):
+    """База для исходника: готовая, если она соответствует ему, иначе собранная заново."""
+    target = store_path(path, cache_dir)
+    if not target.exists():
+        build_store(path, cache_dir)
+    return SqlStore(target)
+
+
+class SqlStore:
+    """Срезы по региону и году, посчитанные запросами к базе."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def query(self, sql, params=()):
+        # Отдельное соединение только на чтение на каждый запрос: сессии Streamlit работают в разных потоках
+        with instrument.span('aggregate', 'sqlite.query') as record:
+            con = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            try:
+                result = pd.read_sql_query(sql, con, params=params)
+            finally:
+                con.close()
+            record['rows'] = len(result)
+        return result
+
+    # Файл базы не меняется после сборки, поэтому регионы и границы дат
+    # читаются из небольшой таблицы daily один раз на объект
+    @functools.cached_property
+    def regions(self):
+        return list(self.query('SELECT DISTINCT region FROM daily ORDER BY region')['region'])
+
+    @functools.cached_property
+    def years(self):
+        first, last = self.bounds
+        return first.year, last.year
+
+    def category_totals(self, region=None, year=None):
+        where, params = _where(region, year)
+        return self.query(
+            f'SELECT category AS "Category", SUM(sales) AS "Sales", SUM(profit) AS "Profit" '
+            f'FROM transactions {where} GROUP BY category ORDER BY category',
+            params,
+        )
+
+    def region_totals(self, year=None):
+        where, params = _where(None, year)
+        return self.query(
+            f'SELECT region AS "Region", SUM(sales) AS "Sales", SUM(profit) AS "Profit" '
+            f'FROM transactions {where} GROUP BY region ORDER BY region',
+            params,
+        )
+
+    def monthly_sales(self, region=None, year=None):
+        where, params = _where(region, year)
+        return self.query(
+            f'SELECT substr(order_date, 1, 7) AS "Month", SUM(sales) AS "Sales" '
+            f'FROM transactions {where} GROUP BY 1 ORDER BY 1',
+            params,
+        )
+
+    def top_customers(self, region=None, year=None, n=10):
+        """Клиенты с наибольшим числом строк заказов в срезе."""
+        where, params = _where(region, year)
+        counts = self.query(
+            f'SELECT customer AS "Customer Name", COUNT(*) AS "rows" '
+            f'FROM transactions {where} GROUP BY customer ORDER BY 2 DESC, 1 LIMIT ?',
+            (*params, n),
+        )
+        return counts.set_index('Customer Name')['rows']
+
+    def customer_error(self, region=None, year=None):
+        """Счётчики клиентов в базе точные."""
+        return 0
+
+    @functools.cached_property
+    def bounds(self):
+        """Первый и последний день с заказами."""
+        bounds = self.query('SELECT MIN(order_date) AS first, MAX(order_date) AS last FROM daily')
+        return pd.Timestamp(bounds['first'][0]), pd.Timestamp(bounds['last'][0])
+
+    def series(self, start, end, region=None, resolution=None, target=TARGET_POINTS):
+        """Ряд за [start, end] из дневной таблицы, как Rollups.series."""
+        resolution = resolution or choose_resolution(start, end, target)
+        first, last = (day_code(day) for day in self.bounds)
+        lo, hi = period_codes([day_code(start), day_code(end)], resolution)
+        lo, hi = max(lo, period_codes([first], resolution)[0]), min(hi, period_codes([last], resolution)[0])
+        clauses, params = ['order_date >= ?', 'order_date < ?'], [_day(period_starts([lo], resolution)[0]),
+                                                                  _day(period_starts([hi + 1], resolution)[0])]
+        if region is not None:
+            clauses.insert(0, 'region = ?')
+            params.insert(0, region)
+        days = self.query(
+            f'SELECT order_date, SUM(sales) AS "Sales", SUM(profit) AS "Profit", SUM(rows) AS "rows", '
+            f'SUM(orders) AS "orders" FROM daily WHERE {" AND ".join(clauses)} GROUP BY order_date',
+            params,
+        )
+        day = pd.to_datetime(days.pop('order_date')).to_numpy().astype('datetime64[D]').astype('int64')
+        codes = np.arange(lo, hi + 1)
+        table = days.groupby(period_codes(day, resolution)).sum().reindex(codes, fill_value=0)
+        table = table.astype({'Sales': 'float64', 'Profit': 'float64', 'rows': 'int64', 'orders': 'int64'})
+        result = table[ROLLUP_MEASURES].reset_index(drop=True)
+        result.insert(0, 'period', period_starts(codes, resolution))
+        return resolution, result
+
+    def scatter_rows(self, region=None, year=None):
+        """Колонки строк среза, нужные диаграммам рассеяния."""
+        where, params = _where(region, year)
+        rows = self.query(
+            f'SELECT category AS "Category", discount AS "Discount", profit AS "Profit", '
+            f'profit_ratio AS "Profit Ratio", is_loss FROM transactions {where}',
+            params,
+        )
+        return rows.astype({'Category': 'category', 'is_loss': 'bool'})
+
+
+def _day(timestamp):
+    return timestamp.strftime('%Y-%m-%d')
+
+
+def _where(region, year):
+    """Условие по региону и году; год задаётся диапазоном дат, чтобы работал индекс."""
+    clauses, params = [], []
+    if region is not None:
+        clauses.append('region = ?')
+        params.append(region)
+    if year is not None:
+        clauses.append('order_date >= ? AND order_date < ?')
+        params.extend([f"{int(year):04d}-01-01", f"{int(year) + 1:04d}-01-01"])
+    return ('WHERE ' + ' AND '.join(clauses) if clauses else ''), params
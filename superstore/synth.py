@@ -0,0 +1,238 @@
+"""Генератор синтетических данных в формате выгрузки Tableau Superstore.
+
+    python -m superstore.synth 1M bench/data/synthetic-1m.parquet --seed 0
+
+Колонки и форматы как в исходной книге (Sales/Profit — строки "$1,234.56"),
+кардинальности растут вместе с числом строк, у клиентов и товаров длинный хвост.
+"""
+import argparse
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = 500_000
+
+# Подкатегория: (категория, медианная цена за единицу, базовая маржа, доля строк)
+SUB_CATEGORIES = {
+    'Bookcases': ('Furniture', 120.0, 0.10, 0.023),
+    'Chairs': ('Furniture', 110.0, 0.12, 0.062),
+    'Furnishings': ('Furniture', 14.0, 0.22, 0.096),
+    'Tables': ('Furniture', 160.0, 0.05, 0.032),
+    'Appliances': ('Office Supplies', 30.0, 0.20, 0.047),
+    'Art': ('Office Supplies', 5.0, 0.28, 0.080),
+    'Binders': ('Office Supplies', 6.0, 0.30, 0.152),
+    'Envelopes': ('Office Supplies', 9.0, 0.42, 0.025),
+    'Fasteners': ('Office Supplies', 3.5, 0.30, 0.022),
+    'Labels': ('Office Supplies', 5.0, 0.43, 0.036),
+    'Paper': ('Office Supplies', 8.0, 0.43, 0.137),
+    'Storage': ('Office Supplies', 35.0, 0.12, 0.085),
+    'Supplies': ('Office Supplies', 9.0, 0.12, 0.019),
+    'Accessories': ('Technology', 30.0, 0.25, 0.078),
+    'Copiers': ('Technology', 350.0, 0.35, 0.007),
+    'Machines': ('Technology', 200.0, 0.15, 0.011),
+    'Phones': ('Technology', 65.0, 0.20, 0.088),
+}
+REGIONS = {'West': 0.32, 'East': 0.285, 'Central': 0.232, 'South': 0.163}
+SEGMENTS = {'Consumer': 0.52, 'Corporate': 0.30, 'Home Office': 0.18}
+SHIP_MODES = {'Standard Class': 0.597, 'Second Class': 0.195, 'First Class': 0.154, 'Same Day': 0.054}
+DISCOUNTS = {
+    0.0: 0.48, 0.2: 0.366, 0.7: 0.042, 0.8: 0.03, 0.3: 0.023, 0.4: 0.021,
+    0.6: 0.014, 0.1: 0.009, 0.5: 0.007, 0.15: 0.005, 0.32: 0.003, 0.45: 0.001,
+}
+FIRST_NAMES = [
+    'Aaron', 'Alan', 'Anna', 'Brian', 'Carl', 'Claire', 'Dan', 'Darren', 'Emily', 'Eric',
+    'Frank', 'Grace', 'Harry', 'Irene', 'Jack', 'Joel', 'Karen', 'Laura', 'Matt', 'Nora',
+    'Noel', 'Olivia', 'Paul', 'Quinn', 'Rick', 'Sandra', 'Sean', 'Tracy', 'Victor', 'William',
+]
+LAST_NAMES = [
+    'Adams', 'Bensley', 'Brown', 'Clark', 'Eaton', 'Evans', 'Ford', 'Glassco', 'Hall', 'Hughes',
+    'Jones', 'King', 'Lee', 'Maddox', 'Miller', 'Moore', 'Ober', 'Phan', 'Powers', 'Reed',
+    'Scott', 'Smith', 'Staavos', 'Taylor', 'Turner', 'Walker', 'White', 'Wilson', 'Young', 'Zhang',
+]
+MANUFACTURERS = [
+    'Avery', 'Acco', 'Apple', 'Bretford', 'Canon', 'Cisco', 'Eldon', 'Fellowes', 'GBC', 'Global',
+    'Hon', 'HP', 'Logitech', 'Message Book', 'Novimex', 'Samsung', 'SAFCO', 'Staples', 'Tenex', 'Xerox',
+]
+START, END = pd.Timestamp('2013-01-01'), pd.Timestamp('2016-12-31')
+
+SIZES = {'10K': 10_000, '1M': 1_000_000, '10M': 10_000_000}
+
+
+def parse_size(text):
+    """'10K' / '1M' / '10M' / '250000' -> число строк."""
+    match = re.fullmatch(r'(\d+)([KkMm]?)', text.strip())
+    if not match:
+        raise ValueError(f"Некорректный размер: {text}")
+    number, suffix = int(match.group(1)), match.group(2).upper()
+    return number * {'': 1, 'K': 1_000, 'M': 1_000_000}[suffix]
+
+
+def format_money(values):
+    """Числа -> строки вида "$1,234.56" / "-$65.00"; форматируются только уникальные значения."""
+    codes, uniques = pd.factorize(np.round(np.asarray(values, dtype='float64'), 2))
+    labels = np.array([f"-${-v:,.2f}" if v < 0 else f"${v:,.2f}" for v in uniques], dtype=object)
+    return labels[codes]
+
+
+class _Universe:
+    """Справочники клиентов и товаров, общие для всех порций одного набора."""
+
+    def __init__(self, n_rows, rng):
+        scale = max(n_rows / 10_000, 1.0)
+        self.n_customers = int(800 * scale ** 0.9)
+        self.n_products = int(1850 * scale ** 0.5)
+
+        self.customer_weights = _zipf_weights(self.n_customers, 0.2)
+        self.customer_names = _customer_names(self.n_customers)
+        self.customer_region = rng.choice(list(REGIONS), self.n_customers, p=list(REGIONS.values()))
+        self.customer_segment = rng.choice(list(SEGMENTS), self.n_customers, p=list(SEGMENTS.values()))
+
+        subs = list(SUB_CATEGORIES)
+        shares = np.array([SUB_CATEGORIES[s][3] for s in subs])
+        self.product_sub = rng.choice(len(subs), self.n_products, p=shares / shares.sum())
+        self.product_weights = _zipf_weights(self.n_products, 0.35)
+        median_price = np.array([SUB_CATEGORIES[s][1] for s in subs])[self.product_sub]
+        self.product_price = np.round(median_price * rng.lognormal(0.0, 0.6, self.n_products), 2)
+        self.product_margin = np.array([SUB_CATEGORIES[s][2] for s in subs])[self.product_sub]
+        manufacturer = rng.integers(0, len(MANUFACTURERS), self.n_products)
+        self.product_manufacturer = np.array(MANUFACTURERS, dtype=object)[manufacturer]
+        self.product_name = np.array(
+            [f"{MANUFACTURERS[m]} {subs[s]} {i:05d}" for i, (m, s) in enumerate(zip(manufacturer, self.product_sub))],
+            dtype=object,
+        )
+        self.sub_names = np.array(subs, dtype=object)
+        self.categories = np.array([SUB_CATEGORIES[s][0] for s in subs], dtype=object)
+
+        # Рост продаж со временем и пик в конце года, как в исходных данных
+        days = pd.date_range(START, END, freq='D')
+        weight = (1 + 0.25 * (days.year.to_numpy() - START.year)) * np.where(days.month >= 9, 1.8, 1.0)
+        self.days = days.to_numpy()
+        self.day_weights = weight / weight.sum()
+
+
+def generate_chunks(n_rows, seed=0, chunk_size=CHUNK_SIZE):
+    """Отдаёт сырые порции синтетической выгрузки; одинаковый seed — одинаковые данные."""
+    universe = _Universe(n_rows, np.random.default_rng(seed))
+    next_order = 100_000
+    produced = 0
+    for index in range(-(-n_rows // chunk_size)):
+        rng = np.random.default_rng([seed, index])
+        size = min(chunk_size, n_rows - produced)
+        chunk, next_order = _chunk(universe, rng, size, next_order)
+        produced += size
+        yield chunk
+
+
+def generate(n_rows, seed=0):
+    return pd.concat(generate_chunks(n_rows, seed), ignore_index=True)
+
+
+def write(path, n_rows, seed=0, chunk_size=CHUNK_SIZE):
+    """Пишет набор в .parquet или .csv порциями, не держа его целиком в памяти."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in generate_chunks(n_rows, seed, chunk_size):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif path.suffix == '.csv':
+        for i, chunk in enumerate(generate_chunks(n_rows, seed, chunk_size)):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    else:
+        raise ValueError(f"Поддерживаются только .parquet и .csv: {path}")
+    return path
+
+
+def _chunk(universe, rng, size, next_order):
+    # Заказы из нескольких строк: в среднем около двух строк на заказ
+    lines = rng.geometric(0.5, size)
+    n_orders = int(np.searchsorted(np.cumsum(lines), size)) + 1
+    lines = lines[:n_orders]
+    lines[-1] -= lines.sum() - size
+
+    customer = rng.choice(universe.n_customers, n_orders, p=universe.customer_weights)
+    order_date = rng.choice(universe.days, n_orders, p=universe.day_weights)
+    ship_mode = rng.choice(list(SHIP_MODES), n_orders, p=list(SHIP_MODES.values()))
+    ship_days = rng.integers(0, 8, n_orders)
+    order_number = np.arange(next_order, next_order + n_orders)
+    order_year = pd.DatetimeIndex(order_date).year.to_numpy()
+    order_id = np.char.add(np.char.add('CA-', order_year.astype(str)), np.char.add('-', order_number.astype(str)))
+
+    row_order = np.repeat(np.arange(n_orders), lines)
+    product = rng.choice(universe.n_products, size, p=universe.product_weights)
+    quantity = np.minimum(rng.geometric(0.27, size), 14)
+    discount = rng.choice(list(DISCOUNTS), size, p=np.array(list(DISCOUNTS.values())) / sum(DISCOUNTS.values()))
+
+    sales = np.round(universe.product_price[product] * quantity * (1 - discount), 2)
+    sales = np.maximum(sales, 0.5)
+    # Маржа падает со скидкой: при скидках от ~0.4 большинство строк убыточны
+    ratio = universe.product_margin[product] - 1.6 * np.maximum(discount - 0.15, 0) + rng.normal(0.0, 0.12, size)
+    ratio = np.clip(ratio, -2.75, 0.5)
+    profit = np.round(sales * ratio, 2)
+    sub = universe.product_sub[product]
+    dates = order_date[row_order]
+
+    frame = pd.DataFrame({
+        'Category': universe.categories[sub],
+        'Country': 'United States',
+        'Customer Name': universe.customer_names[customer][row_order],
+        'Manufacturer': universe.product_manufacturer[product],
+        'Order Date': dates,
+        'Order ID': order_id[row_order],
+        'Product Name': universe.product_name[product],
+        'Region': universe.customer_region[customer][row_order],
+        'Segment': universe.customer_segment[customer][row_order],
+        'Ship Date': dates + ship_days[row_order].astype('timedelta64[D]'),
+        'Ship Mode': ship_mode[row_order],
+        'Sub-Category': universe.sub_names[sub],
+        'Discount': discount,
+        'Number of Records': 1,
+        'Profit': format_money(profit),
+        'Profit Ratio': np.round(profit / sales, 2),
+        'Quantity': quantity,
+        'Sales': format_money(sales),
+    })
+    return frame, next_order + n_orders
+
+
+def _zipf_weights(n, exponent):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _customer_names(n):
+    first = np.array(FIRST_NAMES, dtype=object)
+    last = np.array(LAST_NAMES, dtype=object)
+    i = np.arange(n)
+    names = first[i % len(first)] + ' ' + last[(i // len(first)) % len(last)]
+    # Когда комбинации имён кончаются, добавляется номер
+    overflow = i >= len(first) * len(last)
+    names[overflow] = names[overflow] + ' ' + (i[overflow] // (len(first) * len(last))).astype(str)
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Синтетическая выгрузка Superstore")
+    parser.add_argument('size', help="число строк: 10K, 1M, 10M или целое число")
+    parser.add_argument('output', type=Path, help="путь .parquet или .csv")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    n_rows = parse_size(args.size)
+    write(args.output, n_rows, args.seed)
+    print(f"{n_rows} строк -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Точка безубыточности: интерполяция только между близкими корзинами скидки."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from superstore.breakeven import BreakEven
+
+
+def _rows(category, points):
+    """Строки категории: по одной на (скидка, прибыль)."""
+    discount, profit = zip(*points)
+    profit = np.array(profit, dtype='float64')
+    return pd.DataFrame({
+        'Category': category,
+        'Sub-Category': category,
+        'Discount': np.array(discount, dtype='float32'),
+        'Profit': profit,
+        'Profit Ratio': (profit / 100).astype('float32'),
+        'is_loss': profit < 0,
+    })
+
+
+@pytest.fixture(scope='module')
+def result():
+    df = pd.concat([
+        # Соседние корзины 10% и 20%: средние скидки 0.1 и 0.2, прибыль +10 и −10
+        _rows('Adjacent', [(0.1, 10.0), (0.2, -10.0)]),
+        # В корзине 30% есть и 32%: её средняя скидка 0.31, но корзины всё равно соседние
+        _rows('Spread', [(0.2, 10.0), (0.3, -10.0), (0.32, -10.0)]),
+        # Данные только при 20% и 70%: между ними переход не известен
+        _rows('Gap', [(0.0, 30.0), (0.2, 10.0), (0.7, -10.0)]),
+        _rows('Profitable', [(0.0, 5.0), (0.5, 1.0)]),
+        _rows('Losing', [(0.3, -1.0), (0.4, -2.0)]),
+    ], ignore_index=True)
+    return BreakEven.from_frame(df).break_even('Category').set_index('Category')
+
+
+def test_adjacent_bins_are_interpolated(result):
+    row = result.loc['Adjacent']
+    assert row['break_even_discount'] == pytest.approx(0.15)
+    assert row['break_even_from'] == row['break_even_to'] == pytest.approx(0.15)
+    assert row['first_losing_bin'] == pytest.approx(0.2)
+
+
+def test_spread_inside_bin_is_still_adjacent(result):
+    row = result.loc['Spread']
+    assert row['break_even_discount'] == pytest.approx(0.255)
+    assert row['break_even_from'] == row['break_even_to'] == pytest.approx(0.255)
+
+
+def test_gap_reports_bracket(result):
+    row = result.loc['Gap']
+    assert np.isnan(row['break_even_discount'])
+    assert row['break_even_from'] == pytest.approx(0.2)
+    assert row['break_even_to'] == pytest.approx(0.7)
+
+
+def test_profitable_group_has_no_threshold(result):
+    assert result.loc['Profitable', ['break_even_discount', 'break_even_from', 'break_even_to']].isna().all()
+
+
+def test_losing_from_first_bin(result):
+    row = result.loc['Losing']
+    assert row['break_even_discount'] == pytest.approx(0.3)
+    assert row['break_even_from'] == row['break_even_to'] == pytest.approx(0.3)
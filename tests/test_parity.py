@@ -0,0 +1,126 @@
+"""Разные способы посчитать агрегаты дают одни и те же таблицы.
+
+Проверяется на книге из репозитория: общая таблица поверх Arrow-файла
+против снимка Parquet, SQLite-база против куба в памяти
+по каждому региону и году, потоковый расчёт мелкими порциями (в том числе
+по книге с пустыми строками в конце) и расчёт по партициям в пуле процессов
+против расчёта по всей таблице сразу.
+"""
+import pandas as pd
+import pytest
+
+from superstore.aggregates import Aggregates
+from superstore.ingest import SOURCE, _mapped_frame, load_dataset, load_shared_dataset, shared_path, stream_aggregates
+from superstore.parallel import aggregate_frame, group_partitions, partitioned_aggregates
+from superstore.store import SqlStore, write_store
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    return load_dataset()
+
+
+@pytest.fixture(scope='module')
+def aggregates(dataset):
+    return Aggregates.from_frame(dataset)
+
+
+@pytest.fixture(scope='module')
+def store(dataset, tmp_path_factory):
+    return SqlStore(write_store([dataset], tmp_path_factory.mktemp('store') / 'superstore.sqlite'))
+
+
+def _filters(cube):
+    first, last = cube.years
+    years = [None, *range(first, last + 1)]
+    return [(region, year) for region in [None, *cube.regions] for year in years]
+
+
+def test_shared_dataset_maps_codes(dataset, tmp_path):
+    import pyarrow as pa
+
+    pd.testing.assert_frame_equal(load_shared_dataset(SOURCE, tmp_path), dataset)
+    # Коды категорий и числа лежат внутри отображённого файла, а не в копиях
+    mapped = pa.memory_map(str(shared_path(SOURCE, tmp_path))).read_buffer()
+    shared = _mapped_frame(pa.ipc.open_file(mapped).read_all())
+    for values in (shared['Customer Name'].array.codes, shared['Sales'].to_numpy()):
+        address = values.__array_interface__['data'][0]
+        assert mapped.address <= address < mapped.address + mapped.size
+
+
+def test_store_matches_cube(aggregates, store):
+    cube = aggregates.cube
+    assert sorted(store.regions) == sorted(cube.regions)
+    assert store.years == cube.years
+    for region, year in _filters(cube):
+        pd.testing.assert_frame_equal(store.category_totals(region, year), cube.category_totals(region, year))
+        pd.testing.assert_frame_equal(store.monthly_sales(region, year), cube.monthly_sales(region, year))
+        pd.testing.assert_series_equal(
+            store.top_customers(region, year), cube.top_customers(region, year),
+            check_names=False, check_index_type=False,
+        )
+    for year in [None, *range(cube.years[0], cube.years[1] + 1)]:
+        pd.testing.assert_frame_equal(store.region_totals(year), cube.region_totals(year))
+
+
+def test_store_series_matches_rollups(aggregates, store):
+    first, last = aggregates.rollups.bounds
+    for region in [None, *aggregates.cube.regions]:
+        for start, end in [(first, last), (first, first + pd.Timedelta(days=6)), (last - pd.Timedelta(days=90), last)]:
+            resolution, expected = aggregates.rollups.series(start, end, region)
+            found_resolution, found = store.series(start, end, region)
+            assert found_resolution == resolution
+            pd.testing.assert_frame_equal(found, expected, check_dtype=False)
+
+
+def _assert_same(found, expected):
+    options = dict(check_index_type=False, check_categorical=False)
+    assert found.rows == expected.rows
+    pd.testing.assert_frame_equal(found.cube.cells, expected.cube.cells, **options)
+    pd.testing.assert_series_equal(found.cube.customers, expected.cube.customers, **options)
+    pd.testing.assert_frame_equal(found.rollups.days, expected.rollups.days, **options)
+    pd.testing.assert_frame_equal(found.ranking.top(10), expected.ranking.top(10))
+    pd.testing.assert_frame_equal(found.breakeven.cells, expected.breakeven.cells, **options)
+    pd.testing.assert_series_equal(found.discounts, expected.discounts)
+    pd.testing.assert_frame_equal(found.sample, expected.sample, **options)
+    for key in ('Category', 'Sub-Category', 'Customer Name', 'Region'):
+        pd.testing.assert_frame_equal(found.losses.by(key), expected.losses.by(key), **options)
+    assert found.losses.count == expected.losses.count
+
+
+@pytest.mark.parametrize('chunksize', [500, 1777])
+def test_stream_matches_frame(aggregates, chunksize):
+    _assert_same(stream_aggregates(SOURCE, chunksize=chunksize), aggregates)
+
+
+def test_stream_skips_blank_trailing_rows(aggregates, tmp_path):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(SOURCE)
+    sheet = workbook.worksheets[0]
+    # Отформатированные, но пустые строки после данных: pd.read_excel их не видит
+    last = sheet.max_row
+    for row in (last + 1, last + 2):
+        for column in range(1, sheet.max_column + 1):
+            sheet.cell(row=row, column=column).number_format = '0.00'
+    path = tmp_path / 'blank-rows.xlsx'
+    workbook.save(path)
+    _assert_same(stream_aggregates(path, chunksize=5000), aggregates)
+
+
+@pytest.mark.parametrize('by, workers', [('Year', 1), ('Year', 3), ('Month', 2), ('Month', 5)])
+def test_frame_partitions_match_frame(dataset, aggregates, by, workers):
+    _assert_same(aggregate_frame(dataset, by, workers), aggregates)
+
+
+@pytest.mark.parametrize('by', ['Year', 'Month'])
+def test_file_partitions_match_frame(aggregates, by, tmp_path):
+    _assert_same(partitioned_aggregates(SOURCE, by, workers=2, cache_dir=tmp_path, chunksize=2000), aggregates)
+
+
+def test_partition_groups():
+    assert group_partitions([10, 10, 10, 10], 2) == [[0, 1], [2, 3]]
+    assert group_partitions([100, 1, 1], 2) == [[0], [1, 2]]
+    assert group_partitions([5, 5], 4) == [[0], [1]]
+    assert group_partitions([5, 5, 5], 1) == [[0, 1, 2]]
+    assert group_partitions([], 3) == []
@@ -0,0 +1,60 @@
+"""Потоковый рейтинг клиентов: истинное число заказов внутри [lower, upper], а топ совпадает с точным."""
+import pytest
+
+from superstore import synth
+from superstore.aggregates import MERGE_BATCH, SeenOrders
+from superstore.ingest import CHUNK_SIZE, clean
+from superstore.ranking import CAPACITY, ExactRanking, StreamingRanking
+
+
+@pytest.fixture(scope='module')
+def transactions():
+    return clean(synth.generate(60_000, seed=0))
+
+
+def _streamed(df, chunksize, capacity=CAPACITY, batch=3):
+    """Порции сливаются пачками, как в superstore.aggregates.fold: сжатие срабатывает много раз."""
+    seen = SeenOrders()
+    pending = []
+    for start in range(0, len(df), chunksize):
+        chunk = df.iloc[start:start + chunksize]
+        pending.append(StreamingRanking.from_frame(chunk, seen.first_lines(chunk), capacity=capacity))
+        if len(pending) >= batch:
+            pending = [StreamingRanking.merge_all(pending)]
+    return StreamingRanking.merge_all(pending)
+
+
+def _true_counts(df):
+    return df[['Customer Name', 'Order ID']].astype(str).drop_duplicates().groupby('Customer Name').size()
+
+
+@pytest.mark.parametrize('capacity', [50, 300])
+def test_streaming_bounds_contain_true_counts(transactions, capacity):
+    ranking = _streamed(transactions, 5_000, capacity)
+    assert ranking.reduction > 0
+    truth = _true_counts(transactions)
+    top = ranking.top(len(ranking.weights))
+    expected = truth.reindex(top['Customer Name']).to_numpy()
+    assert (top['lower'].to_numpy() <= expected).all()
+    assert (expected <= top['upper'].to_numpy()).all()
+    # Клиент с числом заказов больше reduction обязан остаться кандидатом
+    assert set(truth[truth > ranking.reduction].index) <= set(ranking.weights.index)
+
+
+def test_exact_ranking_matches_pairs(transactions):
+    seen = SeenOrders()
+    parts = []
+    for start in range(0, len(transactions), 7_000):
+        chunk = transactions.iloc[start:start + 7_000]
+        parts.append(ExactRanking.from_frame(chunk, seen.first_lines(chunk)))
+    counts = ExactRanking.merge_all(parts).counts
+    assert counts.sort_index().equals(_true_counts(transactions).rename(None).sort_index())
+
+
+def test_streaming_top_matches_exact_at_default_chunks():
+    # Порог сжатия каждой порции расширял reduction и путал порядок в топе уже на 1M строк
+    df = clean(synth.generate(1_000_000, seed=0))
+    expected = ExactRanking.from_frame(df).top(10)
+    found = _streamed(df, CHUNK_SIZE, batch=MERGE_BATCH).top(10)
+    assert found['Customer Name'].tolist() == expected['Customer Name'].tolist()
+    assert found['orders'].tolist() == expected['orders'].tolist()
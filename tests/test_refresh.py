@@ -0,0 +1,164 @@
+"""Инкрементальное обновление артефакта: история плюс delta дают ту же загрузку, что и вся выгрузка.
+
+Сценарии на книге из репозитория: перекрывающаяся delta, её повторное
+применение, строки, совпадающие по всем колонкам (строки 384 и 385 книги),
+новая строка уже загруженного заказа, режим рейтинга артефакта,
+прерванный запуск, параллельный предрасчёт и чистка версий.
+"""
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from superstore.aggregates import Aggregates
+from superstore.ingest import SOURCE, load_dataset
+from superstore.precompute import KEEP_VERSIONS, current_version, load_aggregates, open_keys, precompute, require_version
+from superstore.refresh import append_delta
+from superstore.schema import first_lines
+
+HEAD_ROWS = 6000
+# Строки 384 и 385 книги совпадают по всем колонкам
+DUPLICATE_ROW = 384
+
+
+@pytest.fixture(scope='module')
+def raw():
+    return pd.read_excel(SOURCE)
+
+
+@pytest.fixture(scope='module')
+def expected():
+    return Aggregates.from_frame(load_dataset())
+
+
+@pytest.fixture
+def files(raw, tmp_path):
+    paths = {'head': tmp_path / 'head.parquet', 'full': tmp_path / 'full.parquet'}
+    raw.iloc[:HEAD_ROWS].to_parquet(paths['head'])
+    raw.to_parquet(paths['full'])
+    return paths
+
+
+@pytest.fixture
+def artifact_dir(files, tmp_path):
+    directory = tmp_path / 'artifacts'
+    precompute(files['head'], directory, chunksize=1000)
+    return directory
+
+
+def _write(frame, path):
+    frame.reset_index(drop=True).to_parquet(path)
+    return path
+
+
+def _assert_same(found, expected):
+    options = dict(check_index_type=False, check_categorical=False)
+    assert found.rows == expected.rows
+    pd.testing.assert_frame_equal(found.cube.cells, expected.cube.cells, **options)
+    pd.testing.assert_frame_equal(found.rollups.days, expected.rollups.days, **options)
+    pd.testing.assert_frame_equal(found.ranking.top(10), expected.ranking.top(10))
+    assert found.losses.count == expected.losses.count
+
+
+def test_missing_artifact_is_explained(files, tmp_path):
+    with pytest.raises(FileNotFoundError, match='superstore.precompute'):
+        require_version(tmp_path / 'empty')
+    with pytest.raises(FileNotFoundError, match='superstore.precompute'):
+        append_delta(files['full'], tmp_path / 'empty')
+
+
+def test_overlapping_delta_reproduces_full_load(artifact_dir, files, expected):
+    aggregates, added, skipped = append_delta(files['full'], artifact_dir, chunksize=1500)
+    assert (added, skipped) == (len(load_dataset()) - HEAD_ROWS, HEAD_ROWS)
+    _assert_same(aggregates, expected)
+    _assert_same(load_aggregates(current_version(artifact_dir), artifact_dir), expected)
+
+
+def test_reapplied_delta_adds_nothing(artifact_dir, files, expected):
+    append_delta(files['full'], artifact_dir)
+    version = current_version(artifact_dir)
+    aggregates, added, skipped = append_delta(files['full'], artifact_dir, chunksize=777)
+    assert (added, skipped) == (0, expected.rows)
+    assert current_version(artifact_dir) == version
+    _assert_same(aggregates, expected)
+
+
+def test_identical_lines_count_with_multiplicity(artifact_dir, files, raw, tmp_path):
+    append_delta(files['full'], artifact_dir)
+    rows = load_aggregates(current_version(artifact_dir), artifact_dir).rows
+    # Обе копии уже загружены: пропускаются обе
+    both = _write(raw.iloc[[DUPLICATE_ROW, DUPLICATE_ROW + 1]], tmp_path / 'both.parquet')
+    assert append_delta(both, artifact_dir)[1:] == (0, 2)
+    # Третья копия той же строки — новая
+    three = _write(raw.iloc[[DUPLICATE_ROW] * 3], tmp_path / 'three.parquet')
+    aggregates, added, skipped = append_delta(three, artifact_dir)
+    assert (added, skipped) == (1, 2)
+    assert aggregates.rows == rows + 1
+
+
+def test_new_line_of_known_order_keeps_order_count(artifact_dir, raw, tmp_path):
+    before = load_aggregates(current_version(artifact_dir), artifact_dir)
+    line = raw.iloc[[0]].copy()
+    line['Product Name'] = line['Product Name'] + ' (доп.)'
+    aggregates, added, skipped = append_delta(_write(line, tmp_path / 'line.parquet'), artifact_dir)
+    assert (added, skipped) == (1, 0)
+    assert aggregates.rows == before.rows + 1
+    assert aggregates.rollups.days['orders'].sum() == before.rollups.days['orders'].sum()
+    assert aggregates.ranking.counts.sum() == before.ranking.counts.sum()
+
+
+def test_refresh_keeps_artifact_ranking_mode(artifact_dir, files, monkeypatch):
+    monkeypatch.setattr('superstore.ranking.RANKING_MODE', 'streaming')
+    aggregates, added, _ = append_delta(files['full'], artifact_dir)
+    assert added > 0
+    assert aggregates.ranking.mode == 'exact'
+    with pytest.raises(ValueError, match='режимами рейтинга'):
+        Aggregates.merge_all([aggregates, Aggregates.from_frame(load_dataset().iloc[:100])])
+
+
+def test_aborted_run_is_discarded(artifact_dir, files, expected):
+    # Ключи следующей версии записаны, но CURRENT на неё не переключён
+    keys = open_keys(artifact_dir, base=current_version(artifact_dir))
+    chunk = load_dataset().iloc[HEAD_ROWS:]
+    keys.record(chunk, first_lines(chunk))
+    keys.commit()
+    keys.close()
+    aggregates, added, skipped = append_delta(files['full'], artifact_dir)
+    assert (added, skipped) == (expected.rows - HEAD_ROWS, HEAD_ROWS)
+    _assert_same(aggregates, expected)
+
+
+def test_parallel_precompute_matches_and_cleans_up(files, tmp_path):
+    serial, parallel = tmp_path / 'serial', tmp_path / 'parallel'
+    precompute(files['head'], serial, chunksize=1000)
+    version = precompute(files['head'], parallel, chunksize=1000, workers=2)
+    _assert_same(load_aggregates(version, parallel), load_aggregates(current_version(serial), serial))
+    assert not list(parallel.glob('partitions-*'))
+
+
+def test_old_versions_are_pruned(artifact_dir, files, raw, tmp_path):
+    for number in range(3):
+        line = raw.iloc[[number]].copy()
+        line['Order ID'] = f"CA-2099-{number:06d}"
+        append_delta(_write(line, tmp_path / f"line{number}.parquet"), artifact_dir)
+    versions = sorted(path.name for path in artifact_dir.glob('v*'))
+    assert len(versions) == KEEP_VERSIONS
+
+    con = sqlite3.connect(artifact_dir / 'keys.sqlite')
+    try:
+        stored = [f"v{version:06d}" for (version,) in con.execute('SELECT version FROM versions ORDER BY version')]
+        # Все версии линии опираются на первый полный расчёт, поэтому его ключи остаются
+        assert con.execute('SELECT SUM(copies) FROM lines').fetchone()[0] == HEAD_ROWS + 3
+    finally:
+        con.close()
+    assert stored == versions
+
+    # Новый полный расчёт начинает свою линию: ключи прежней удаляются, когда её версии уходят с диска
+    precompute(files['head'], artifact_dir, chunksize=1000)
+    precompute(files['head'], artifact_dir, chunksize=1000)
+    con = sqlite3.connect(artifact_dir / 'keys.sqlite')
+    try:
+        assert con.execute('SELECT SUM(copies) FROM lines').fetchone()[0] == 2 * HEAD_ROWS
+        assert con.execute('SELECT COUNT(DISTINCT base) FROM versions').fetchone()[0] == 2
+    finally:
+        con.close()
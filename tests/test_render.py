@@ -0,0 +1,93 @@
+"""Кэш графиков: вытеснение по числу записей и байтам, пропуск слишком больших записей, закрытие фигур, кэш спецификаций."""
+import pandas as pd
+import pytest
+
+from superstore.render import ChartCache, _pyplot, render_png, spec_nbytes
+
+
+def _draw(ax):
+    ax.plot([1, 2, 3], [3, 1, 2])
+
+
+def test_evicts_least_recently_used_entries():
+    cache = ChartCache(max_entries=2)
+    cache.put('a', b'1')
+    cache.put('b', b'2')
+    assert cache.get('a') == b'1'
+    cache.put('c', b'3')
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (b'1', b'3')
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'entries': 2, 'bytes': 2}
+
+
+def test_evicts_by_bytes():
+    cache = ChartCache(max_bytes=10)
+    cache.put('a', b'x' * 4)
+    cache.put('b', b'x' * 4)
+    cache.put('c', b'x' * 4)
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 8
+    # Замена записи учитывает её прежний размер
+    cache.put('b', b'x' * 6)
+    assert cache.stats()['bytes'] == 10
+    assert cache.get('c') == b'x' * 4
+
+
+def test_skips_png_larger_than_budget():
+    cache = ChartCache(max_bytes=10)
+    cache.put('a', b'x' * 4)
+    cache.put('b', b'x' * 11)
+    assert cache.get('b') is None
+    assert cache.get('a') == b'x' * 4
+    # Слишком большая новая версия убирает и прежнюю
+    cache.put('a', b'x' * 11)
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 0
+
+
+def test_render_closes_figure():
+    plt = _pyplot()
+    plt.close('all')
+    png = render_png(_draw, figsize=(2, 2))
+    assert png.startswith(b'\x89PNG')
+    assert plt.get_fignums() == []
+
+
+def test_render_closes_figure_when_draw_fails():
+    plt = _pyplot()
+    plt.close('all')
+
+    def fail(ax):
+        raise RuntimeError("ошибка рисования")
+
+    with pytest.raises(RuntimeError):
+        render_png(fail)
+    assert plt.get_fignums() == []
+
+
+def test_cache_renders_once_per_key():
+    cache = ChartCache()
+    calls = []
+
+    def draw(ax):
+        calls.append(ax)
+        _draw(ax)
+
+    key = ('chart', ('West', 2016), 'fingerprint')
+    assert cache.render(key, draw, (2, 2)) == cache.render(key, draw, (2, 2))
+    assert len(calls) == 1
+
+
+def test_spec_cache_builds_once_per_key():
+    cache = ChartCache(sizeof=spec_nbytes)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return pd.DataFrame({'x': [1, 2, 3]}), {'mark': 'bar'}
+
+    key = ('chart', ('West', 2016), 'fingerprint')
+    data, spec = cache.spec(key, build)
+    assert cache.spec(key, build)[0] is data
+    assert len(calls) == 1
+    assert cache.stats()['bytes'] == spec_nbytes((data, spec))
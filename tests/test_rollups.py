@@ -0,0 +1,69 @@
+"""Коды периодов и даты их начала на известных границах недель, месяцев и кварталов.
+
+Проверяется напрямую: SqlStore.series строит ряды теми же функциями,
+поэтому сравнение базы с кубом эти формулы не проверяет.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from superstore.rollups import day_code, period_codes, period_starts
+
+
+def _code(date, resolution):
+    return int(period_codes([day_code(date)], resolution)[0])
+
+
+def _start(code, resolution):
+    return period_starts([code], resolution)[0]
+
+
+@pytest.mark.parametrize('date, code, start', [
+    # 1970-01-01 — четверг: его неделя началась в понедельник 1969-12-29
+    ('1969-12-29', 0, '1969-12-29'),
+    ('1970-01-01', 0, '1969-12-29'),
+    ('1970-01-04', 0, '1969-12-29'),
+    ('1970-01-05', 1, '1970-01-05'),
+    ('1969-12-28', -1, '1969-12-22'),
+    # Воскресенье 2017-01-01 относится к неделе с понедельника 2016-12-26
+    ('2017-01-01', 2452, '2016-12-26'),
+    ('2017-01-02', 2453, '2017-01-02'),
+])
+def test_weeks_start_on_monday(date, code, start):
+    assert _code(date, 'week') == code
+    assert _start(code, 'week') == pd.Timestamp(start)
+
+
+@pytest.mark.parametrize('date, code, start', [
+    ('1970-01-31', 0, '1970-01-01'),
+    ('1970-02-01', 1, '1970-02-01'),
+    ('1969-12-31', -1, '1969-12-01'),
+    ('2016-02-29', 553, '2016-02-01'),
+    ('2016-03-01', 554, '2016-03-01'),
+])
+def test_month_codes(date, code, start):
+    assert _code(date, 'month') == code
+    assert _start(code, 'month') == pd.Timestamp(start)
+
+
+@pytest.mark.parametrize('date, code, start', [
+    ('1970-03-31', 0, '1970-01-01'),
+    ('1970-04-01', 1, '1970-04-01'),
+    ('1969-12-31', -1, '1969-10-01'),
+    ('2016-09-30', 186, '2016-07-01'),
+    ('2016-10-01', 187, '2016-10-01'),
+])
+def test_quarter_codes(date, code, start):
+    assert _code(date, 'quarter') == code
+    assert _start(code, 'quarter') == pd.Timestamp(start)
+
+
+@pytest.mark.parametrize('resolution', ['day', 'week', 'month', 'quarter'])
+def test_every_day_falls_inside_its_period(resolution):
+    days = np.arange(day_code('1969-01-01'), day_code('2020-12-31') + 1)
+    codes = period_codes(days, resolution)
+    dates = pd.DatetimeIndex(days.astype('datetime64[D]').astype('datetime64[s]'))
+    assert (period_starts(codes, resolution) <= dates).all()
+    assert (dates < period_starts(codes + 1, resolution)).all()
+    # Коды идут подряд: у соседних дней код либо тот же, либо следующий
+    assert set(np.diff(codes)) <= {0, 1}
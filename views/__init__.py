@@ -0,0 +1 @@
+"""Страницы дашборда; модуль страницы импортируется только когда она открыта."""
@@ -0,0 +1,85 @@
+import streamlit as st
+
+from superstore import instrument, plots, specs
+from views.common import current_fingerprint, get_periods, get_slicer, profiling_enabled, scatter_population, scatter_rows, show_chart
+
+
+RESOLUTION_LABELS = {'day': "дни", 'week': "недели", 'month': "месяцы", 'quarter': "кварталы"}
+MEASURE_LABELS = {'Sales': "Продажи", 'Profit': "Прибыль", 'orders': "Заказы"}
+
+
+def render():
+    st.header("📊 Графики продаж и прибыли")
+    st.markdown("Выберите регион и год, чтобы фильтровать данные")
+    filtered_charts()
+
+
+# Смена фильтра перезапускает только этот фрагмент, а не весь скрипт
+@st.fragment
+def filtered_charts():
+    # При перезапуске только фрагмента app.py не выполняется, поэтому трассировка своя
+    with instrument.traced("Графики", enabled=profiling_enabled()):
+        _filtered_charts()
+
+
+def _filtered_charts():
+    fingerprint = current_fingerprint()
+    slicer = get_slicer(fingerprint)
+
+    # Фильтры
+    col1, col2 = st.columns(2)
+    selected_region = col1.selectbox("Выберите регион", slicer.regions)
+    selected_year = col2.slider("Выберите год", *slicer.years)
+    filters = (selected_region, selected_year)
+    instrument.set_filters(region=selected_region, year=selected_year)
+
+    # Агрегаты берутся из среза куба (или SQL-запросом), строки нужны только для диаграммы рассеяния
+    category_totals = slicer.category_totals(selected_region, selected_year)
+
+    # Продажи по категориям
+    st.subheader(f"📈 Продажи по категориям ({selected_region}, {selected_year})")
+    category_sales = category_totals[['Category', 'Sales']]
+    show_chart('category_sales', filters, lambda ax: plots.category_bars(ax, category_sales, 'Sales', "viridis", "Продажи"), figsize=(8, 5),
+               spec=lambda: specs.category_bars(category_sales, 'Sales', "viridis", "Продажи"))
+
+    # Прибыль по категориям
+    st.subheader(f"📉 Прибыль по категориям ({selected_region}, {selected_year})")
+    category_profit = category_totals[['Category', 'Profit']]
+    show_chart('category_profit', filters, lambda ax: plots.category_bars(ax, category_profit, 'Profit', "coolwarm", "Прибыль"), figsize=(8, 5),
+               spec=lambda: specs.category_bars(category_profit, 'Profit', "redblue", "Прибыль"))
+
+    # Продажи по месяцам
+    monthly_sales = slicer.monthly_sales(selected_region, selected_year)
+
+    st.subheader(f"📆 Продажи по месяцам ({selected_region}, {selected_year})")
+    show_chart('monthly_sales', filters, lambda ax: plots.monthly_line(ax, monthly_sales), figsize=(10, 6),
+               spec=lambda: specs.monthly_line(monthly_sales))
+
+    # Скидка vs Прибыль
+    st.subheader(f"💸 Скидка vs Прибыль ({selected_region}, {selected_year})")
+    population = scatter_population(fingerprint, selected_region, selected_year)
+    # Строки отбираются только при отрисовке: готовый PNG берётся из кэша без среза таблицы
+    show_chart('discount_profit', filters,
+               lambda ax: plots.discount_profit_scatter(ax, scatter_rows(fingerprint, *filters), alpha=0.7, population=population),
+               figsize=(10, 6), spec=lambda: specs.discount_profit_bins(scatter_rows(fingerprint, *filters), population=population))
+
+    # Топ клиентов по количеству заказов
+    st.subheader(f"🏆 Топ-10 клиентов по количеству заказов ({selected_region}, {selected_year})")
+    top_customers = slicer.top_customers(selected_region, selected_year, n=10)
+    show_chart('top_customers', filters, lambda ax: plots.customers_barh(ax, top_customers, "Количество заказов"), figsize=(8, 6),
+               spec=lambda: specs.customers_barh(top_customers, "Количество заказов"))
+    error = slicer.customer_error(selected_region, selected_year)
+    if error:
+        st.caption(f"Потоковый подсчёт: число заказов каждого клиента может быть занижено не более чем на {error}")
+
+    # Динамика за произвольный период: разрешение подбирается под длину диапазона
+    periods = get_periods(fingerprint)
+    first, last = (day.date() for day in periods.bounds)
+    st.subheader(f"📅 Динамика за период ({selected_region})")
+    start, end = st.slider("Период", min_value=first, max_value=last, value=(first, last), format="DD.MM.YYYY")
+    measure = st.radio("Показатель", list(MEASURE_LABELS), format_func=MEASURE_LABELS.get, horizontal=True)
+    resolution, series = periods.series(start, end, region=selected_region)
+    period_filters = (selected_region, start, end, measure)
+    show_chart('period_series', period_filters, lambda ax: plots.period_line(ax, series, measure, MEASURE_LABELS[measure]), figsize=(10, 5),
+               spec=lambda: specs.period_line(series, measure, MEASURE_LABELS[measure]))
+    st.caption(f"Разрешение: {RESOLUTION_LABELS[resolution]}, точек: {len(series)}")
@@ -0,0 +1,196 @@
+import os
+
+import streamlit as st
+
+from superstore import instrument
+from superstore.aggregates import Aggregates
+from superstore.cube import row_positions
+from superstore.ingest import SOURCE, load_shared_dataset, source_fingerprint, stream_aggregates
+from superstore.parallel import partitioned_aggregates
+from superstore.precompute import ARTIFACT_DIR, Summary, load_aggregates, load_summary, require_version
+from superstore.render import ChartCache, spec_nbytes
+from superstore.store import open_store
+
+# 'memory' — очищенная таблица целиком в памяти;
+# 'stream' — выгрузка читается порциями, в памяти остаются только агрегаты;
+# 'parallel' — выгрузка раскладывается по месяцам, агрегаты считаются в пуле процессов;
+# 'artifact' — готовый артефакт python -m superstore.precompute / superstore.refresh
+INGEST_MODE = os.environ.get('SUPERSTORE_INGEST', 'memory')
+# Откуда страница «Графики» берёт срезы по фильтрам:
+# 'pandas' — куб агрегатов в памяти; 'sqlite' — запросы к локальной базе с индексами
+QUERY_BACKEND = os.environ.get('SUPERSTORE_QUERY', 'pandas')
+# Как рисуются графики: 'png' — matplotlib на сервере; 'vega' — Vega-Lite в браузере
+# для графиков, у которых есть спецификация (см. superstore.specs), остальные — PNG
+CHART_MODE = os.environ.get('SUPERSTORE_CHARTS', 'png')
+# Сколько версий данных держат кэши ресурсов: текущая и предыдущая, пока на неё смотрят открытые сессии
+CACHED_VERSIONS = 2
+
+
+def profiling_enabled():
+    """Замеры включаются SUPERSTORE_PROFILE=1 или параметром ?profile=1 в адресе."""
+    return instrument.env_enabled() or st.query_params.get('profile') == '1'
+
+
+def current_fingerprint():
+    if INGEST_MODE == 'artifact':
+        return require_version(ARTIFACT_DIR)
+    return source_fingerprint(SOURCE)
+
+
+# Одна неизменяемая таблица на процесс поверх отображённого в память снимка;
+# сессии получают её саму, а не копии, и создают только небольшие срезы
+@st.cache_resource(show_spinner="Загрузка данных...", max_entries=CACHED_VERSIONS)
+def get_dataset(fingerprint):
+    return load_shared_dataset(SOURCE)
+
+
+# Агрегаты и индекс строк строятся один раз на версию данных
+@st.cache_resource(show_spinner="Подготовка агрегатов...", max_entries=CACHED_VERSIONS)
+def get_aggregates(fingerprint):
+    if INGEST_MODE == 'artifact':
+        return load_aggregates(fingerprint, ARTIFACT_DIR)
+    if INGEST_MODE == 'stream':
+        return stream_aggregates(SOURCE)
+    if INGEST_MODE == 'parallel':
+        return partitioned_aggregates(SOURCE)
+    return Aggregates.from_frame(get_dataset(fingerprint))
+
+
+# Таблицы статичных разделов: из артефакта читаются готовыми, иначе считаются из агрегатов
+@st.cache_resource(show_spinner="Подготовка таблиц...", max_entries=CACHED_VERSIONS)
+def get_summary(fingerprint):
+    if INGEST_MODE == 'artifact':
+        return load_summary(fingerprint, ARTIFACT_DIR)
+    return Summary.from_aggregates(get_aggregates(fingerprint))
+
+
+def get_cube(fingerprint):
+    return get_aggregates(fingerprint).cube
+
+
+# База собирается один раз на версию исходника, запросы открывают свои соединения
+@st.cache_resource(show_spinner="Подготовка базы...", max_entries=CACHED_VERSIONS)
+def get_store(fingerprint):
+    return open_store(SOURCE)
+
+
+def get_slicer(fingerprint):
+    """Источник срезов по региону и году: куб или SQLite-база (одинаковый интерфейс)."""
+    if QUERY_BACKEND == 'sqlite':
+        return get_store(source_fingerprint(SOURCE))
+    return get_cube(fingerprint)
+
+
+def get_periods(fingerprint):
+    """Источник рядов за период: дневные ряды агрегатов или таблица daily базы (одинаковый интерфейс)."""
+    if QUERY_BACKEND == 'sqlite':
+        return get_store(source_fingerprint(SOURCE))
+    return get_aggregates(fingerprint).rollups
+
+
+@st.cache_resource(max_entries=CACHED_VERSIONS)
+def get_row_positions(fingerprint):
+    return row_positions(get_dataset(fingerprint))
+
+
+def scatter_rows(fingerprint, region=None, year=None):
+    """Строки для диаграмм рассеяния: из таблицы в памяти или из выборки агрегатов."""
+    with instrument.span('transform', 'scatter_rows') as record:
+        if QUERY_BACKEND == 'sqlite' and region is not None:
+            rows = get_store(source_fingerprint(SOURCE)).scatter_rows(region, year)
+        elif INGEST_MODE != 'memory':
+            rows = get_aggregates(fingerprint).sample
+            if region is not None:
+                rows = rows[(rows['Region'] == region) & (rows['Year'] == year)]
+        else:
+            rows = get_dataset(fingerprint)
+            if region is not None:
+                rows = rows.take(get_row_positions(fingerprint).get((region, year), []))
+        record['rows'] = len(rows)
+    return rows
+
+
+def scatter_population(fingerprint, region=None, year=None, losses=False):
+    """Сколько строк (или убыточных строк) стоит за scatter_rows; None, если это не выборка."""
+    if INGEST_MODE == 'memory' or (QUERY_BACKEND == 'sqlite' and region is not None):
+        return None
+    cells = get_cube(fingerprint).slice(region, year)
+    return int(cells['losses' if losses else 'rows'].sum())
+
+
+# Готовые PNG общие для всех сессий процесса
+@st.cache_resource
+def get_chart_cache():
+    return ChartCache()
+
+
+# Данные и спецификации Vega-Lite: таблица по всей выборке строится один раз на фильтры и версию данных
+@st.cache_resource
+def get_spec_cache():
+    return ChartCache(sizeof=spec_nbytes)
+
+
+def show_chart(chart_id, filters, draw, figsize=None, spec=None):
+    """PNG из кэша графиков или, в режиме 'vega', данные и спецификация spec() для браузера.
+
+    Оба варианта кэшируются по одному ключу: (id графика, фильтры, версия данных).
+    """
+    key = (chart_id, filters, current_fingerprint())
+    if CHART_MODE == 'vega' and spec is not None:
+        data, vega_spec = get_spec_cache().spec(key, spec)
+        st.vega_lite_chart(data, vega_spec, width="stretch")
+        return
+    st.image(get_chart_cache().render(key, draw, figsize), width="stretch")
+
+
+def ranking_label(summary):
+    """Подпись оси графика рейтинга: в потоковом режиме столбцы — верхние оценки."""
+    if summary.metrics['ranking']['mode'] == 'exact':
+        return "Количество уникальных заказов"
+    return "Уникальных заказов, верхняя оценка"
+
+
+def ranking_caption(summary):
+    """Подпись с границами ошибки, если рейтинг клиентов посчитан потоково."""
+    bounds = summary.metrics['ranking']
+    if bounds['mode'] == 'exact':
+        return
+    if not bounds['missed_orders']:
+        # Счётчики ни разу не сжимались: подсчёт точный, диапазоны не нужны
+        st.caption("Потоковый подсчёт: счётчики не сжимались, числа заказов точные")
+        return
+    table = summary['top_customers_by_orders']
+    ranges = ", ".join(f"{row['Customer Name']}: {row['lower']}–{row['upper']}" for _, row in table.iterrows())
+    st.caption(
+        f"Потоковый подсчёт: столбцы — верхние оценки, у клиента может быть до "
+        f"{bounds['missed_orders']} заказов меньше, поэтому порядок клиентов внутри этого зазора не гарантирован. "
+        f"Гарантированные диапазоны: {ranges}"
+    )
+
+
+def breakeven_points(summary):
+    """Границы безубыточной скидки по категориям (без категорий, прибыльных при любой скидке).
+
+    Колонки start и end совпадают, если точка интерполирована по соседним
+    корзинам, иначе это промежуток без данных, где лежит переход.
+    """
+    breakeven = summary['breakeven_by_category'].dropna(subset=['break_even_to'])
+    points = breakeven.set_index('Category')[['break_even_from', 'break_even_to']]
+    return points.set_axis(['start', 'end'], axis=1).sort_values(['start', 'end'])
+
+
+def _percent_range(start, end):
+    low, high = round(start * 100), round(end * 100)
+    return f"{low}%" if low == high else f"{low}–{high}%"
+
+
+def breakeven_range(points):
+    """Диапазон порогов по категориям для текста: «24–38%», «30%» или «—», если порогов нет."""
+    if points.empty:
+        return "—"
+    return _percent_range(points['start'].min(), points['end'].max())
+
+
+def breakeven_labels(points):
+    """Порог каждой категории для текста: «24%» или «20–70%», если между корзинами нет данных."""
+    return {category: _percent_range(row['start'], row['end']) for category, row in points.iterrows()}
@@ -0,0 +1,285 @@
+import streamlit as st
+
+from superstore import plots, specs
+from views.common import (
+    breakeven_labels, breakeven_points, breakeven_range, current_fingerprint, get_summary, ranking_caption, ranking_label,
+    scatter_population, scatter_rows, show_chart,
+)
+
+
+def render():
+    fingerprint = current_fingerprint()
+    summary = get_summary(fingerprint)
+    # Пороги убыточности скидок считаются по данным (superstore.breakeven), а не задаются в тексте
+    points = breakeven_points(summary)
+    threshold = breakeven_range(points)
+    by_category = ", ".join(f"{category} — {label}" for category, label in breakeven_labels(points).items())
+
+    # Визуализация
+    st.title("📊 Пет-проект: Анализ данных супермаркета")
+
+    # Введение / описание проекта
+    st.markdown("""
+    ## 📌 Цель проекта
+
+    Проанализировать данные из датасета `Tableau Superstore.xlsx`, чтобы:
+    - Понять структуру продаж
+    - Определить категории и регионы с наибольшей и наименьшей прибылью
+    - Выявить влияние скидок на прибыль
+    - Сформулировать гипотезы для улучшения бизнес-процессов
+    """)
+
+    # Продажи и прибыль по категориям
+    st.subheader("📈 Продажи и прибыль по категориям")
+    category_sales = summary['category_totals']
+    show_chart('sales_and_profit', (), lambda ax: plots.sales_and_profit_bars(ax, category_sales))
+
+    # Продажи по категориям
+    st.subheader("📈 Продажи по категориям")
+    category_sales = summary['category_totals'][['Category', 'Sales']]
+    show_chart('total_category_sales', (), lambda ax: plots.simple_bars(ax, category_sales, 'Sales', 'Category', "Продажи", "Категория"))
+
+    st.markdown("""
+    ## 📊 Что показывают графики:
+    **Общая прибыль по категориям:**
+    - Technology — самая прибыльная категория (~145,000)
+    - Office Supplies — вторая по прибыльности (~120,000)
+    - Furniture — значительно уступает другим категориям (~20,000)<br>
+    **Общие продажи по категориям:**
+    - Technology — лидирует по продажам (~850,000)
+    - Office Supplies — вторая по объему продаж (~720,000)
+    - Furniture — также имеет высокий объем продаж (~750,000), но при этом показывает низкую прибыль
+    ## 🧠 Выводы:
+    **1. Разница между продажами и прибылью**<br>
+    Technology :
+    Самая прибыльная категория.
+    Высокие продажи + высокая маржа → стабильный источник дохода.<br>
+    Office Supplies :
+    Средняя прибыльность.
+    Продажи чуть ниже Technology, но всё ещё значительные.<br>
+    Furniture :
+    Низкая прибыльность.
+    Большие продажи, но низкая маржа → потенциальная проблема с ценовой политикой или издержками.<br>
+    **2. Причины низкой прибыли в Furniture**
+    - Возможно, высокие затраты на производство или доставку мебели.
+    - Могут быть большие скидки для привлечения клиентов.
+    - Может потребоваться пересмотр ценовой политики для этой категории.<br>
+    **3. Технологии как ключевая категория**
+    - Technology демонстрирует высокие продажи и прибыль.
+    - Это может быть связано с высокой маржинальностью технологических товаров (например, электроника, устройства).
+    - Возможно, стоит инвестировать больше ресурсов в эту категорию.<br>
+    **4. Офисные принадлежности как баланс между продажами и прибылью**
+    Office Supplies имеют средний уровень прибыли .
+    Это может быть связано с более конкурентным рынком или низкой маржинальностью некоторых товаров.
+    ## 💡 Гипотезы для дальнейшего анализа:
+    **1. Как увеличить прибыль в Furniture?**
+    - Гипотеза 1 : Увеличить цены на некоторые товары с низкой маржинальностью.
+    - Гипотеза 2 : Оптимизировать логистику и хранение.
+    - Гипотеза 3 : Фокусироваться на более дорогих и прибыльных подкатегориях мебели.<br>
+    **2. Можно ли увеличить продажи Office Supplies?**
+    - Гипотеза 1 : Провести A/B тестирование ценовых стратегий.
+    - Гипотеза 2 : Улучшить маркетинговые кампании для этой категории.
+    - Гипотеза 3 : Разработать новые продукты или услуги, связанные с Office Supplies.
+                """, unsafe_allow_html=True)
+
+    # Прибыль по регионам
+    st.subheader("📉 Прибыль по регионам")
+    region_profit = summary['region_totals'][['Region', 'Profit']]
+    show_chart('region_profit', (), lambda ax: plots.simple_bars(ax, region_profit, 'Profit', 'Region', "Прибыль", "Регион"))
+
+    st.markdown("""
+    ## 📊 Что показывает график:
+    **Продажи по регионам:**<br>
+    - West — лидирует по объему продаж (~720,000).
+    - East — второй по объему продаж (~680,000).
+    - Central — третье место (~500,000).
+    - South — имеет наименьшие продажи (~400,000).<br>
+    **Прибыль по регионам:**
+    - West — самая прибыльная зона (~105,000).
+    - East — вторая по прибыльности (~90,000).
+    - Central — третья по прибыльности (~40,000).
+    - South — наименее прибыльный регион (~45,000).
+    ## 🧠 Выводы:
+    **1. Регионы с высокими продажами и прибылью**<br>
+    **West:**
+    Лидирует как по продажам, так и по прибыли.
+    Это может быть связано с высокой плотностью населения , большим спросом или эффективной маркетинговой стратегией в этом регионе.<br>
+    **East:**
+    Второй по объему продаж и прибыли.
+    Возможно, этот регион также имеет значительную клиентскую базу и стабильный спрос.<br>
+    **2. Регионы с низкими показателями**<br>
+    **South:**
+    Низкие продажи и прибыль.
+    Может быть связано с меньшей концентрацией покупателей , низким спросом или неэффективной ценовой политикой.<br>
+    **Central:**
+    Продажи выше, чем в South, но прибыль ниже East и West.
+    Возможно, высокие издержки или низкая маржинальность товаров в этом регионе.<br>
+    **3. Связь между продажами и прибылью**<br>
+    В целом, регион West демонстрирует лучший баланс между объемом продаж и прибылью .
+    East также показывает хорошие результаты, но его прибыль немного ниже, чем у West.
+    South и Central имеют низкую маржинальность, что требует внимания.
+    ## 💡 Гипотезы для дальнейшего анализа:
+    **1. Как увеличить прибыль в Central и South?**
+    - Гипотеза 1 : Оптимизация ценовой политики (увеличение маржи).
+    - Гипотеза 2 : Улучшение логистики и снижение издержек.
+    - Гипотеза 3 : Фокус на наиболее прибыльных категориях товаров.<br>
+    **2. Можно ли улучшить эффективность в East?**
+    - Гипотеза 1 : Провести A/B тестирование ценовых стратегий.
+    - Гипотеза 2 : Увеличить инвестиции в маркетинг для привлечения новых клиентов.
+    - Гипотеза 3 : Анализировать успешные практики West и применять их в East.
+                """, unsafe_allow_html=True)
+
+    # Продажи по месяцам
+    st.subheader("📆 Продажи по месяцам")
+
+    monthly_sales = summary['monthly_sales']  # '2013-01', '2013-02' и т.д.
+    show_chart('total_monthly_sales', (), lambda ax: plots.monthly_line(ax, monthly_sales, tick_step=2), figsize=(12, 6),
+               spec=lambda: specs.monthly_line(monthly_sales))
+
+    # Описание графика
+    st.markdown("""
+    ## 📊 Что показывает график:
+
+    **Продажи по месяцам:**  
+    График отображает динамику продаж с 2013 по 2017 год.<br>
+    Продажи имеют сезонные колебания:<br>
+    - Периоды роста (например, конец года).<br>
+    - Периоды спада (например, начало года).<br>
+
+    **Общие тенденции:**<br>
+    - В целом, продажи растут со временем.<br>
+    - Есть высокая волатильность — большие пики и провалы.<br>
+
+    **Пиковые точки:**<br>
+    - Высокие продажи наблюдаются в конце каждого года (например, декабрь 2016 и 2017).<br>
+    - Низкие продажи чаще всего происходят в начале года (январь–февраль).
+    """ + "\n\n" + """
+    ## 🧠 Выводы из графика:
+
+    **1. Сезонность продаж**<br>
+    - Повышение продаж в конце года: Это может быть связано с праздничным сезоном (например, Рождество, Новый год).<br>
+    - Снижение продаж в начале года: Возможно, клиенты закупают товары заранее для праздников или ожидают новых товаров после зимних каникул.
+
+    **2. Общая тенденция роста**<br>
+    - Продажи стабильно растут с 2013 по 2017 год.<br>
+    - Это указывает на рост бизнеса и увеличение клиентской базы.
+
+    **3. Волатильность**<br>
+    Большая волатильность может быть связана с:<br>
+    - Сезонными акциями или промоакциями.<br>
+    - Изменениями в логистике или производственных процессах.<br>
+    - Короткими сроками действия скидок.
+    """, unsafe_allow_html=True)
+
+    # Скидка vs Прибыль
+    st.subheader("💸 Скидка vs Прибыль")
+    population = scatter_population(fingerprint)
+    show_chart('total_discount_profit', (),
+               lambda ax: plots.discount_profit_scatter(ax, scatter_rows(fingerprint), alpha=0.6, population=population),
+               spec=lambda: specs.discount_profit_bins(scatter_rows(fingerprint), population=population))
+
+    # Описание графика
+    st.markdown(f"""
+    ## 📊 Что показывает график:
+    **Скидка (%) на оси x :** Указана доля скидки, которую получают клиенты.<br>
+    **Прибыль на оси y :** Показывает прибыль от заказов с данной скидкой.<br>
+    **Цвета :** Разные категории товаров (Office Supplies, Furniture, Technology).<br>
+
+    **Основные наблюдения:**
+    - Точки выше нулевой линии : Значит, прибыль положительная.
+    - Точки ниже нулевой линии : Значит, прибыль отрицательная (убытки).
+    - Красная пунктирная линия : Нулевая прибыль — граница между прибылью и убытками.
+    ## 🧠 Выводы из графика:
+    **1. Корреляция между скидкой и прибылью**
+    - Общая тенденция : С увеличением скидки (выше 0.4–0.5 ) прибыль снижается.
+    - Убытки : При больших скидках многие точки оказываются ниже нулевой линии , что указывает на убытки.<br>
+
+    **2. При какой скидке начинаются убытки?**<br>
+    Средняя прибыль строк переходит через ноль при скидке: {by_category}.
+    Это означает, что при скидках выше {threshold} компания в среднем начинает терять деньги.<br>
+
+    **3. Различия между категориями:**<br>
+    - Technology :
+    Лучшая стабильность прибыли даже при высоких скидках.
+    Меньше точек ниже нулевой линии.
+    - Furniture :
+    Наиболее чувствительна к скидкам.
+    Многие точки ниже нулевой линии уже при средних скидках.
+    - Office Supplies :
+    Похожа на Furniture, но менее чувствительна к скидкам.
+    ## 💡 Гипотезы для проверки:
+    **1. Как влияют скидки на прибыль?**
+    - Гипотеза 1 : Чем выше скидка, тем больше вероятность убытков.
+    - Гипотеза 2 : Есть оптимальный уровень скидок, после которого прибыль резко падает.
+    - Гипотеза 3 : Категории товаров реагируют по-разному на скидки.<br>
+    **2. Почему Technology лучше других категорий?**<br>
+    - Гипотеза 1 : Высокая маржинальность технологических товаров позволяет сохранять прибыль даже при больших скидках.
+    - Гипотеза 2 : Другие категории имеют более низкую маржинальность, поэтому скидки быстро приводят к убыткам.<br>
+    **3. Можно ли найти оптимальную скидку?**
+    - Гипотеза 1 : Существует оптимальный диапазон скидок (например, 0–0.3), где прибыль максимальна.
+    - Гипотеза 2 : Для каждой категории существует свой оптимальный уровень скидок.<br>
+    **4. Что происходит при очень высоких скидках?**
+    - Гипотеза 1 : Очень высокие скидки (> 0.7) всегда приводят к убыткам.
+    - Гипотеза 2 : Возможно, есть исключения — некоторые товары могут быть выгодны даже при больших скидках.
+                """, unsafe_allow_html=True)
+
+    # Топ-10 клиентов по количеству уникальных заказов
+    st.subheader("🏆 Топ-10 клиентов по количеству заказов")
+    top_customers = summary['top_customers_by_orders'].set_index('Customer Name')['orders']
+    label = ranking_label(summary)
+    show_chart('total_top_customers', (), lambda ax: plots.customers_barh(ax, top_customers, label),
+               spec=lambda: specs.customers_barh(top_customers, label))
+    ranking_caption(summary)
+
+    #
+    st.markdown("""
+    ## 📊 Что показывает график:
+    **1. Ключевые клиенты**<br>
+    Emily Phan :
+    Сделала 17 заказов — это наибольшее количество среди всех клиентов .
+    Возможно, это корпоративный клиент или часто совершающий покупки .
+    Другие клиенты (Rick Bensley, Noel Staavos, Joel Eaton и др.):
+    Имеют 12–13 заказа.<br>
+    **2. Распределение заказов**<br>
+    Одинаковое количество заказов может указывать на стабильность спроса среди этих клиентов.<br>
+    **3. Возможные причины активности клиентов**<br>
+    Emily Phan :
+    Может быть корпоративным клиентом с регулярными заказами.
+    Возможно, она покупает большие партии товаров или часто делает небольшие заказы .
+    Другие клиенты :
+    Могут быть частными лицами или малыми предприятиями .
+    Их активность может быть связана с регулярными потребностями в товарах.
+    ## 💡 Гипотезы для дальнейшего анализа:
+    **1. Как удержать ключевых клиентов?**<br>
+    - Гипотеза 1 : Предложить персонализированные предложения для ключевых клиентов.
+    - Гипотеза 2 : Создать программу лояльности для часто совершающих покупки клиентов.
+    - Гипотеза 3 : Провести анализ потребностей этих клиентов и предложить им специальные пакеты услуг.<br>
+    **2. Можно ли увеличить количество заказов у других клиентов?**
+    - Гипотеза 1 : Провести A/B тестирование различных маркетинговых стратегий для активных клиентов.
+    - Гипотеза 2 : Оптимизировать логистику и доставку для улучшения клиентского опыта.
+    - Гипотеза 3 : Предложить специальные акции для клиентов, которые делают меньше заказов, чем Emily Phan.
+                """, unsafe_allow_html=True)
+
+    # Выводы
+    st.markdown(f"""
+    ## 🔍 Ключевые выводы
+
+    1. **Категория Technology** — самая прибыльная ($~145,000).
+    2. **Furniture** имеет высокие продажи, но низкую прибыль ($~20,000) → маржинальность слишком мала.
+    3. **West** — самый прибыльный регион.
+    4. **При скидках свыше {threshold}** (порог свой у каждой категории) средняя прибыль становится отрицательной.
+    5. **Emily Phan** — лидер по количеству заказов (17), что может указывать на корпоративную активность.
+    """)
+
+    # Гипотезы
+    st.markdown(f"""
+    ## 💡 Гипотезы
+
+    | Номер | Гипотеза |
+    |-------|-----------|
+    | 1 | Убытки начинаются при скидке выше {threshold}: скидки сверх порога категории стоит ограничить |
+    | 2 | Убытки в Furniture связаны с логистикой и хранением |
+    | 3 | Регион South можно сделать более прибыльным через маркетинг |
+    | 4 | Таблицы и переплётные системы требуют пересмотра ценовой политики |
+    | 5 | Можно прогнозировать рост продаж к концу года и готовиться к нему заранее |
+    """)
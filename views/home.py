@@ -0,0 +1,17 @@
+import streamlit as st
+
+
+def render():
+    st.markdown("""
+    # 👋 Привет!
+    
+    Это мой pet-проект по анализу данных из датасета **Tableau Superstore**.
+    
+    Здесь ты найдёшь:
+    - Графики продаж и прибыли
+    - Топ клиентов
+    - Сезонность
+    - Интерактивные фильтры
+    
+    Используй сайдбар слева для навигации 📊
+    """)
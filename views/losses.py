@@ -0,0 +1,119 @@
+import streamlit as st
+
+from superstore import plots, specs
+from views.common import (
+    breakeven_labels, breakeven_points, breakeven_range, current_fingerprint, get_summary, scatter_population, scatter_rows,
+    show_chart,
+)
+
+
+def render():
+    fingerprint = current_fingerprint()
+    summary = get_summary(fingerprint)
+
+    st.header("💸 Анализ убыточных заказов")
+    
+    # Показываем общее количество убыточных заказов
+    total_losses = summary.metrics['loss_count']
+    st.markdown(f"### 🔍 Количество убыточных заказов: **{total_losses}**")
+
+    # Топ-5 убыточных записей
+    losses_top_5 = summary['loss_top_rows']
+    st.markdown("### 📉 Топ-5 убыточных товаров:")
+    st.dataframe(losses_top_5[['Product Name', 'Sales', 'Profit', 'Discount']].style.background_gradient(cmap='Reds'))
+
+    # Гипотезы
+    st.markdown("## 💡 Гипотезы:")
+    st.markdown(f"""
+    1. **Скидки выше {breakeven_range(breakeven_points(summary))} в среднем приводят к убыткам**  
+       Пример: Cubify CubeX 3D Printer с 70% скидкой принёс убыток $6600 при продаже за $4500
+    
+    2. **Убытки чаще всего связаны с 3D-принтерами и переплётными системами**  
+       Например: GBC DocuBind P400, Lexmark MX611dhe
+    
+    3. **Маржа по некоторым продуктам недостаточна для таких больших скидок**  
+       Нужно пересчитать рентабельность и скорректировать цену или политику скидок
+    
+    4. **Некоторые клиенты/регионы получают необоснованно высокие скидки**  
+       Это можно проверить через фильтрацию данных по клиентам и регионам
+    """)
+
+    # Убытки по категориям
+    st.subheader("📉 Убытки по категориям")
+    loss_by_category = summary['loss_by_category']
+    show_chart('loss_by_category', (), lambda ax: plots.loss_bars(ax, loss_by_category, "Reds", "Категория"), figsize=(8, 5))
+
+    # Убытки по подкатегориям
+    st.subheader("📊 Топ-10 убыточных подкатегорий")
+    loss_by_subcategory = summary['loss_by_subcategory']
+    show_chart('loss_by_subcategory', (), lambda ax: plots.loss_bars(ax, loss_by_subcategory, "OrRd", "Подкатегория"), figsize=(10, 6))
+
+    # Скидки и убытки
+    st.subheader("🧮 Средняя скидка по убыточным заказам")
+    avg_discount_for_losses = summary.metrics['loss_avg_discount']
+    st.markdown(f"Средняя скидка по убыточным заказам: **{avg_discount_for_losses:.2%}**")
+
+    show_chart('discount_histogram', (), lambda ax: plots.discount_histogram(ax, summary['discount_frequencies'], avg_discount_for_losses, weights='rows'), figsize=(10, 6))
+
+    # Точки безубыточности по скидке, посчитанные по данным
+    st.subheader("🎯 При какой скидке заказы становятся убыточными")
+    show_chart('loss_probability', (), lambda ax: plots.loss_probability_lines(ax, summary['discount_curves']), figsize=(10, 6),
+               spec=lambda: specs.loss_probability_lines(summary['discount_curves']))
+    breakeven = summary['breakeven_by_category']
+    st.markdown("Средняя прибыль переходит через ноль при скидке: " + ", ".join(
+        f"**{category}** — {label}" for category, label in breakeven_labels(breakeven_points(summary)).items()
+    ))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### Категории")
+        st.dataframe(_breakeven_table(breakeven), hide_index=True)
+    with col2:
+        st.markdown("#### Подкатегории")
+        st.dataframe(_breakeven_table(summary['breakeven_by_subcategory']), hide_index=True)
+
+    # Profit Ratio
+    st.subheader("📉 Прибыльность по отношению к скидке")
+    population = scatter_population(fingerprint, losses=True)
+    show_chart('profit_ratio', (), lambda ax: plots.profit_ratio_scatter(ax, _loss_rows(fingerprint), population=population),
+               figsize=(10, 6))
+
+    # Топ клиентов и регионов
+    st.markdown("## 🚨 Клиенты и регионы с убытками")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        top_customers = summary['loss_by_customer']
+        st.markdown("#### 👤 Топ клиентов по убыткам")
+        st.dataframe(top_customers.style.background_gradient(cmap='Reds'))
+
+    with col2:
+        top_regions = summary['loss_by_region']
+        st.markdown("#### 🌍 Регионы с убытками")
+        st.dataframe(top_regions.style.background_gradient(cmap='Reds'))
+
+
+def _loss_rows(fingerprint):
+    # Отбирается только при отрисовке: готовый PNG берётся из кэша без прохода по таблице
+    rows = scatter_rows(fingerprint)
+    return rows[rows['is_loss']]
+
+
+def _breakeven_table(breakeven):
+    """Точки безубыточности в процентах.
+
+    Пустая безубыточная скидка при заполненных границах — между корзинами
+    нет данных, пустая строка целиком — группа прибыльна при любой скидке.
+    """
+    return breakeven.rename(columns={
+        'break_even_discount': "Безубыточная скидка",
+        'break_even_from': "Переход не раньше",
+        'break_even_to': "Переход не позже",
+        'first_losing_bin': "Убыточны > 50% строк с",
+        'rows': "Строк",
+    }).style.format({
+        "Безубыточная скидка": '{:.0%}',
+        "Переход не раньше": '{:.0%}',
+        "Переход не позже": '{:.0%}',
+        "Убыточны > 50% строк с": '{:.0%}',
+    }, na_rep='—')